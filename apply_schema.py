@@ -26,4 +26,41 @@ with engine.begin() as conn:
         );
     """))
 
+# Wei columns moved from VARCHAR(100) to NUMERIC(78,0). Postgres refuses to
+# retype columns referenced by views, so if the dbt staging views already
+# exist this is skipped; drop them (or re-run after `dbt run --full-refresh`).
+try:
+    with engine.begin() as conn:
+        conn.execute(text("""
+            ALTER TABLE raw.etherscan_transactions
+                ALTER COLUMN value_wei DROP DEFAULT,
+                ALTER COLUMN value_wei TYPE NUMERIC(78,0) USING value_wei::numeric,
+                ALTER COLUMN value_wei SET DEFAULT 0,
+                ALTER COLUMN gas_price_wei TYPE NUMERIC(78,0) USING gas_price_wei::numeric;
+        """))
+except Exception as e:
+    print(f"Skipped wei column type change: {e.__class__.__name__}")
+
+# Raw landing tables are re-extractable, so skip WAL on their bulk loads
+# (matches docker/init.sql). SET UNLOGGED is a no-op if already unlogged.
+RAW_TABLES = (
+    "etherscan_transactions", "defillama_tvl", "defillama_fees", "dune_wallet_labels",
+    "token_prices", "cross_chain_activity", "wallet_enrichment",
+)
+with engine.begin() as conn:
+    for table in RAW_TABLES:
+        conn.execute(text(f"ALTER TABLE IF EXISTS raw.{table} SET UNLOGGED"))
+
+# Indexes on join/filter columns used by the dbt models. CREATE INDEX
+# CONCURRENTLY can't run inside a transaction block, so use autocommit.
+with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+    conn.execute(text("""
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_etherscan_tx_from_ts
+        ON raw.etherscan_transactions (from_address, block_timestamp);
+    """))
+    conn.execute(text("""
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_defillama_tvl_protocol_date
+        ON raw.defillama_tvl (protocol_name, date);
+    """))
+
 print("Schema updates applied successfully.")
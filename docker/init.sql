@@ -13,18 +13,21 @@ CREATE SCHEMA IF NOT EXISTS marts;
 -- ────────────────────────────────────────────────
 -- RAW TABLES (landing zone, minimal transformation)
 -- ────────────────────────────────────────────────
+-- UNLOGGED: raw data is re-extractable from the APIs, so skip WAL on the
+-- bulk loads. Postgres empties unlogged tables after a crash; re-run the
+-- extractors to repopulate. _pipeline_runs below stays logged.
 
 -- Etherscan: wallet transactions on DeFi contracts
-CREATE TABLE IF NOT EXISTS raw.etherscan_transactions (
+CREATE UNLOGGED TABLE IF NOT EXISTS raw.etherscan_transactions (
     tx_hash             VARCHAR(66)   NOT NULL,
     block_number        BIGINT        NOT NULL,
     block_timestamp     TIMESTAMP     NOT NULL,
     from_address        VARCHAR(42)   NOT NULL,
     to_address          VARCHAR(42),
     contract_address    VARCHAR(42),
-    value_wei           VARCHAR(100)  DEFAULT '0',
+    value_wei           NUMERIC(78,0) DEFAULT 0,
     gas_used            BIGINT,
-    gas_price_wei       VARCHAR(100),
+    gas_price_wei       NUMERIC(78,0),
     method_id           VARCHAR(10),
     function_name       VARCHAR(255),
     is_error            BOOLEAN       DEFAULT FALSE,
@@ -39,7 +42,7 @@ CREATE INDEX IF NOT EXISTS idx_etherscan_tx_timestamp ON raw.etherscan_transacti
 CREATE INDEX IF NOT EXISTS idx_etherscan_tx_protocol ON raw.etherscan_transactions(protocol_name);
 
 -- DeFiLlama: TVL history per protocol
-CREATE TABLE IF NOT EXISTS raw.defillama_tvl (
+CREATE UNLOGGED TABLE IF NOT EXISTS raw.defillama_tvl (
     id                  SERIAL        PRIMARY KEY,
     protocol_slug       VARCHAR(100)  NOT NULL,
     protocol_name       VARCHAR(255),
@@ -53,7 +56,7 @@ CREATE TABLE IF NOT EXISTS raw.defillama_tvl (
 CREATE INDEX IF NOT EXISTS idx_defillama_tvl_date ON raw.defillama_tvl(date);
 
 -- DeFiLlama: Protocol fees & revenue
-CREATE TABLE IF NOT EXISTS raw.defillama_fees (
+CREATE UNLOGGED TABLE IF NOT EXISTS raw.defillama_fees (
     id                  SERIAL        PRIMARY KEY,
     protocol_slug       VARCHAR(100)  NOT NULL,
     date                DATE          NOT NULL,
@@ -64,7 +67,7 @@ CREATE TABLE IF NOT EXISTS raw.defillama_fees (
 );
 
 -- Dune Analytics: Wallet labels / segments
-CREATE TABLE IF NOT EXISTS raw.dune_wallet_labels (
+CREATE UNLOGGED TABLE IF NOT EXISTS raw.dune_wallet_labels (
     wallet_address      VARCHAR(42)   NOT NULL,
     label               VARCHAR(100),
     label_type          VARCHAR(100),
@@ -76,7 +79,7 @@ CREATE TABLE IF NOT EXISTS raw.dune_wallet_labels (
 );
 
 -- CoinGecko: Daily token prices
-CREATE TABLE IF NOT EXISTS raw.token_prices (
+CREATE UNLOGGED TABLE IF NOT EXISTS raw.token_prices (
     id                  SERIAL        PRIMARY KEY,
     token_id            VARCHAR(100)  NOT NULL,
     token_symbol        VARCHAR(20),
@@ -96,7 +99,7 @@ CREATE INDEX IF NOT EXISTS idx_token_prices_symbol ON raw.token_prices(token_sym
 -- ────────────────────────────────────────────────
 
 -- Li.Fi: Cross-chain activity for Nomad Score
-CREATE TABLE IF NOT EXISTS raw.cross_chain_activity (
+CREATE UNLOGGED TABLE IF NOT EXISTS raw.cross_chain_activity (
     wallet_address              VARCHAR(42)   NOT NULL,
     distinct_chains_used        INTEGER,
     total_bridging_volume_usd   NUMERIC(20,2),
@@ -106,7 +109,7 @@ CREATE TABLE IF NOT EXISTS raw.cross_chain_activity (
 );
 
 -- Zerion/Zapper: Wallet historical win-rates
-CREATE TABLE IF NOT EXISTS raw.wallet_enrichment (
+CREATE UNLOGGED TABLE IF NOT EXISTS raw.wallet_enrichment (
     wallet_address              VARCHAR(42)   NOT NULL,
     historical_win_rate         NUMERIC(5,4),
     realized_profit_usd         NUMERIC(20,2),
@@ -1,16 +1,48 @@
 """
 Extract package for DeFi Revenue Attribution Pipeline.
+
+Extractors are imported on first attribute access (PEP 562), so importing
+one submodule (or the CLI) doesn't pull in every other source's
+dependencies.
 """
-from .base_extractor import BaseExtractor
-from .etherscan_extractor import EtherscanExtractor
-from .defillama_extractor import DeFiLlamaExtractor
-from .dune_extractor import DuneExtractor
-from .coingecko_extractor import CoinGeckoExtractor
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .base_extractor import BaseExtractor
+    from .coingecko_extractor import CoinGeckoExtractor
+    from .defillama_extractor import DeFiLlamaExtractor
+    from .dune_extractor import DuneExtractor
+    from .etherscan_extractor import EtherscanExtractor
 
+_EXPORTS = {
+    "BaseExtractor": ".base_extractor",
+    "EtherscanExtractor": ".etherscan_extractor",
+    "DeFiLlamaExtractor": ".defillama_extractor",
+    "DuneExtractor": ".dune_extractor",
+    "CoinGeckoExtractor": ".coingecko_extractor",
+}
+
+# Spelled out (not list(_EXPORTS)) so linters see the TYPE_CHECKING imports used
 __all__ = [
     "BaseExtractor",
-    "EtherscanExtractor",
+    "CoinGeckoExtractor",
     "DeFiLlamaExtractor",
     "DuneExtractor",
-    "CoinGeckoExtractor",
+    "EtherscanExtractor",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value  # cache: later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,24 @@
+"""
+Shared NumPy random source for the mock/enrichment extractors.
+
+Every extractor draws from its own named PCG64 stream. With RANDOM_SEED set,
+each stream is reproducible no matter how the parallel orchestrator
+schedules extractors across threads. Without it, streams take fresh OS
+entropy, unless a caller passes a default seed.
+"""
+from __future__ import annotations
+
+import zlib
+
+import numpy as np
+
+from .config import settings
+
+
+def rng_for(stream: str, default_seed: int | None = None) -> np.random.Generator:
+    """Return a Generator for `stream`, seeded from settings.random_seed or `default_seed`."""
+    seed = settings.random_seed if settings.random_seed is not None else default_seed
+    if seed is None:
+        return np.random.default_rng()
+    # crc32 gives a stable per-stream key (hash() is salted per process)
+    return np.random.default_rng([seed, zlib.crc32(stream.encode())])
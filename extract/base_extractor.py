@@ -3,28 +3,88 @@ BaseExtractor — abstract base class for all data source extractors.
 
 Provides:
 - Retry logic with exponential backoff (via tenacity)
-- Rate limiting
+- Token-bucket rate limiting (thread-safe, shared across concurrent workers)
+- Bounded concurrency for fan-out over protocols / tokens
+- Per-host cap on in-flight requests, shared by every extractor in the process
 - Structured logging (via loguru)
 - Abstract interface: extract() → pd.DataFrame
+- Streaming interface: extract_chunks() → Iterator[pd.DataFrame]
 """
 from __future__ import annotations
 
-import time
+import queue
+import threading
 from abc import ABC, abstractmethod
-from datetime import datetime
-from typing import Any
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, ClassVar, TypeVar
+from urllib.parse import urlparse
 
+import numpy as np
+import orjson
 import pandas as pd
 import requests
 from loguru import logger
+from requests.adapters import HTTPAdapter
+from sqlalchemy.exc import DBAPIError, OperationalError
 from tenacity import (
     retry,
-    retry_if_exception_type,
+    retry_if_exception,
     stop_after_attempt,
     wait_exponential,
 )
 
 from .config import settings
+from .rate_limiter import TokenBucket
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Bound once at import so the request hot path doesn't re-resolve settings
+_REQUEST_TIMEOUT = settings.request_timeout
+_MAX_RETRIES = settings.max_retries
+# In-flight requests allowed per host across all extractors (see _host_semaphore)
+MAX_REQUESTS_PER_HOST = 8
+
+# Substrings APIs use for throttling / quota / timeout failures in error text
+_TRANSIENT_MARKERS = ("429", "rate limit", "too many requests", "quota", "timed out", "timeout")
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """
+    True for errors worth retrying: timeouts, dropped connections, HTTP 429/5xx,
+    database operational errors (lost connection, lock or statement timeout,
+    deadlock) and API messages mentioning rate limits or quotas.
+
+    Anything else (bad payloads, KeyError/ValueError from parsing) is treated
+    as permanent so it fails fast instead of being retried.
+    """
+    if isinstance(exc, (requests.Timeout, requests.ConnectionError, TimeoutError)):
+        return True
+    if isinstance(exc, OperationalError) or (
+        isinstance(exc, DBAPIError) and exc.connection_invalidated
+    ):
+        return True
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        status = exc.response.status_code
+        if status == 429 or status >= 500:
+            return True
+    message = str(exc).lower()
+    return any(marker in message for marker in _TRANSIENT_MARKERS)
+
+
+@lru_cache(maxsize=8)
+def fallback_wallets(n: int = 100) -> tuple[str, ...]:
+    """
+    Deterministic placeholder addresses 0x00..01 … 0x..{n:x} for offline runs.
+
+    Shared by the enrichment extractors so their fallback rows still JOIN.
+    Built once with vectorised NumPy string ops and cached.
+    """
+    hex_ids = np.char.zfill(np.char.mod("%x", np.arange(1, n + 1)), 40)
+    return tuple(np.char.add("0x", hex_ids).tolist())
 
 
 class BaseExtractor(ABC):
@@ -34,14 +94,37 @@ class BaseExtractor(ABC):
     api_base_url: str = ""
     target_table: str = ""
     rate_limit_rps: float = 2.0  # requests per second
+    rate_limit_burst: float = 1.0  # requests that may be sent back-to-back
+    max_concurrency: int = 8  # parallel in-flight requests per extractor
+    pool_maxsize: int = 64  # keep-alive connections retained per host
+
+    # Class-level so extractors running in parallel share one cap per host
+    _host_semaphores: ClassVar[dict[str, threading.Semaphore]] = {}
+    _host_semaphores_lock: ClassVar[threading.Lock] = threading.Lock()
 
     def __init__(self) -> None:
         self._session = self._build_session()
-        self._last_request_time: float = 0.0
+        self._limiter = TokenBucket(self.rate_limit_rps, capacity=self.rate_limit_burst)
         logger.info(f"Initialized extractor: {self.name}")
 
     def _build_session(self) -> requests.Session:
-        session = requests.Session()
+        if settings.http_cache_enabled:
+            # Transparent SQLite-backed cache keyed on URL + params. Only GETs
+            # are cached; Dune's POST /execute never goes through this session.
+            import requests_cache
+            session = requests_cache.CachedSession(
+                cache_name=settings.http_cache_path,
+                backend="sqlite",
+                expire_after=timedelta(days=settings.http_cache_expire_days),
+                allowable_methods=("GET",),
+            )
+        else:
+            session = requests.Session()
+        # Keep connections warm so repeated calls to the same host skip the
+        # TCP + TLS handshake. Retries are handled by tenacity, not urllib3.
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_maxsize, max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
         session.headers.update(
             {
                 "User-Agent": "DeFi-Revenue-Attribution-Pipeline/1.0",
@@ -50,18 +133,83 @@ class BaseExtractor(ABC):
         )
         return session
 
-    def _throttle(self) -> None:
-        """Enforce rate limiting between requests."""
-        min_interval = 1.0 / self.rate_limit_rps
-        elapsed = time.monotonic() - self._last_request_time
-        if elapsed < min_interval:
-            time.sleep(min_interval - elapsed)
-        self._last_request_time = time.monotonic()
+    @classmethod
+    def _host_semaphore(cls, url: str) -> threading.Semaphore:
+        """Semaphore bounding concurrent in-flight requests to the URL's host."""
+        host = urlparse(url).netloc
+        with cls._host_semaphores_lock:
+            sem = cls._host_semaphores.get(host)
+            if sem is None:
+                sem = cls._host_semaphores[host] = threading.Semaphore(MAX_REQUESTS_PER_HOST)
+            return sem
+
+    def _map_concurrent(self, fn: Callable[[T], R], items: Iterable[T]) -> list[R]:
+        """Apply `fn` to every item on a bounded thread pool, preserving order."""
+        items = list(items)
+        if len(items) <= 1 or self.max_concurrency <= 1:
+            return [fn(item) for item in items]
+        workers = min(self.max_concurrency, len(items))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=self.name) as pool:
+            return list(pool.map(fn, items))
+
+    def _iter_concurrent(
+        self,
+        fn: Callable[[T], Iterable[R]],
+        items: Iterable[T],
+    ) -> Iterator[R]:
+        """
+        Run one generator per item on a bounded thread pool and yield their
+        chunks as they arrive. A small hand-off queue applies back-pressure so
+        at most ~max_concurrency chunks are buffered in memory.
+        """
+        items = list(items)
+        if len(items) <= 1 or self.max_concurrency <= 1:
+            for item in items:
+                yield from fn(item)
+            return
+
+        chunks: queue.Queue = queue.Queue(maxsize=self.max_concurrency)
+        stop = threading.Event()
+        done = object()
+
+        def _put(value: object) -> None:
+            while not stop.is_set():
+                try:
+                    chunks.put(value, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def _worker(item: T) -> None:
+            try:
+                for chunk in fn(item):
+                    if stop.is_set():
+                        return
+                    _put(chunk)
+            finally:
+                _put(done)
+
+        workers = min(self.max_concurrency, len(items))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=self.name) as pool:
+            futures = [pool.submit(_worker, item) for item in items]
+            try:
+                remaining = len(futures)
+                while remaining:
+                    chunk = chunks.get()
+                    if chunk is done:
+                        remaining -= 1
+                        continue
+                    yield chunk
+            finally:
+                # Unblock workers if the consumer stopped early
+                stop.set()
+        for future in futures:
+            future.result()  # re-raise worker errors
 
     @retry(
-        retry=retry_if_exception_type((requests.Timeout, requests.ConnectionError)),
+        retry=retry_if_exception(is_transient_error),
         wait=wait_exponential(multiplier=1, min=2, max=30),
-        stop=stop_after_attempt(settings.max_retries),
+        stop=stop_after_attempt(_MAX_RETRIES),
         reraise=True,
     )
     def _make_request(
@@ -70,18 +218,25 @@ class BaseExtractor(ABC):
         params: dict[str, Any] | None = None,
         headers: dict[str, str] | None = None,
     ) -> dict[str, Any] | list:
-        """Make an HTTP GET request with retry and rate limiting."""
-        self._throttle()
+        """Make an HTTP GET request with retry, rate limiting and a per-host cap."""
         url = f"{self.api_base_url}{endpoint}" if not endpoint.startswith("http") else endpoint
         try:
-            response = self._session.get(
-                url,
-                params=params,
-                headers=headers,
-                timeout=settings.request_timeout,
-            )
+            # Two layers: the host semaphore bounds concurrency, the token
+            # bucket bounds this extractor's request rate
+            with self._host_semaphore(url):
+                self._limiter.acquire()
+                response = self._session.get(
+                    url,
+                    params=params,
+                    headers=headers,
+                    timeout=_REQUEST_TIMEOUT,
+                )
             response.raise_for_status()
-            return response.json()
+            # orjson parses the raw bytes directly; several times faster than
+            # response.json() on large Etherscan pages / CoinGecko charts
+            data = orjson.loads(response.content)
+            self._check_payload(data)
+            return data
         except requests.HTTPError as e:
             logger.error(f"[{self.name}] HTTP {response.status_code} for {url}: {e}")
             raise
@@ -89,30 +244,61 @@ class BaseExtractor(ABC):
             logger.error(f"[{self.name}] Request failed for {url}: {e}")
             raise
 
+    def _check_payload(self, data: dict[str, Any] | list) -> None:
+        """Raise for errors an API reports inside a 200 response; runs under the retry."""
+
+    def close(self) -> None:
+        """Release pooled HTTP connections."""
+        self._session.close()
+
     @abstractmethod
     def extract(self) -> pd.DataFrame:
         """Extract data from source and return a clean DataFrame."""
         ...
 
+    def extract_chunks(self) -> Iterator[pd.DataFrame]:
+        """
+        Yield the extract as a sequence of loadable DataFrames.
+
+        Defaults to a single extract() frame; override to stream large sources
+        page by page so they never have to be held in memory at once.
+        """
+        yield self.extract()
+
+    def extract_columns(self) -> dict[str, np.ndarray] | None:
+        """
+        Optional structure-of-arrays extract: {column: ndarray}, all equal length.
+
+        Sources that generate their data as NumPy arrays can override this so
+        the orchestrator COPYs the arrays directly (PostgresLoader.copy_columns)
+        without building a DataFrame. The default None means "use extract_chunks()".
+        """
+        return None
+
     def validate(self, df: pd.DataFrame) -> pd.DataFrame:
         """Basic validation — override in subclasses for custom rules."""
         if df.empty:
             logger.warning(f"[{self.name}] Extraction returned empty DataFrame")
-        else:
-            logger.info(f"[{self.name}] Extracted {len(df):,} rows")
+            return df
+        logger.info(f"[{self.name}] Extracted {len(df):,} rows")
         return df
 
     def run(self, loader=None) -> int:
         """Extract, validate, optionally load. Returns number of rows processed."""
         started_at = datetime.utcnow()
         try:
-            df = self.extract()
-            df = self.validate(df)
-            if loader is not None and not df.empty:
-                rows_loaded = loader.upsert(df, self.target_table)
-                logger.success(f"[{self.name}] Loaded {rows_loaded:,} rows → {self.target_table}")
-                return rows_loaded
-            return len(df)
+            rows = 0
+            for df in self.extract_chunks():
+                df = self.validate(df)
+                if loader is not None and not df.empty:
+                    rows += loader.upsert(df, self.target_table)
+                else:
+                    rows += len(df)
+            if loader is not None:
+                logger.success(f"[{self.name}] Loaded {rows:,} rows → {self.target_table}")
+            return rows
         except Exception as e:
             logger.error(f"[{self.name}] Extractor failed: {e}")
             raise
+        finally:
+            self.close()
@@ -6,8 +6,6 @@ API docs: https://www.coingecko.com/en/api/documentation
 """
 from __future__ import annotations
 
-from datetime import datetime, date, timedelta
-
 import pandas as pd
 from loguru import logger
 
@@ -22,6 +20,7 @@ class CoinGeckoExtractor(BaseExtractor):
     api_base_url = "https://api.coingecko.com/api/v3"
     target_table = "token_prices"
     rate_limit_rps = 0.4  # 30 req/min = 0.5 req/sec; use 0.4 to be safe
+    max_concurrency = 16  # one in-flight request per token; the limiter caps throughput
 
     TOKEN_MAP: dict[str, str] = {
         "ethereum":      "ETH",
@@ -34,6 +33,8 @@ class CoinGeckoExtractor(BaseExtractor):
     }
 
     def __init__(self, api_key: str | None = None) -> None:
+        # Set before the base class builds the shared token bucket
+        self.rate_limit_rps = settings.coingecko_rate_limit_rps
         super().__init__()
         self.api_key = api_key or settings.coingecko_api_key
         self.tokens = settings.tracked_tokens
@@ -64,55 +65,56 @@ class CoinGeckoExtractor(BaseExtractor):
             logger.error(f"[coingecko] Failed to fetch {token_id}: {e}")
             return pd.DataFrame()
 
-        prices = data.get("prices", [])
-        market_caps = {int(row[0]): row[1] for row in data.get("market_caps", [])}
-        volumes = {int(row[0]): row[1] for row in data.get("total_volumes", [])}
-
-        rows = []
-        for ts_ms, price in prices:
-            ts_ms = int(ts_ms)
-            dt = date.fromtimestamp(ts_ms / 1000)
-            rows.append(
-                {
-                    "token_id": token_id,
-                    "token_symbol": self.TOKEN_MAP.get(token_id, token_id.upper()),
-                    "date": dt,
-                    "price_usd": round(float(price), 8),
-                    "market_cap_usd": round(market_caps.get(ts_ms, 0), 2),
-                    "volume_24h_usd": round(volumes.get(ts_ms, 0), 2),
-                }
-            )
+        # One small frame per series, aligned on the shared millisecond timestamp
+        prices = pd.DataFrame(data.get("prices", []), columns=["ts", "price_usd"])
+        market_caps = pd.DataFrame(data.get("market_caps", []), columns=["ts", "market_cap_usd"])
+        volumes = pd.DataFrame(data.get("total_volumes", []), columns=["ts", "volume_24h_usd"])
+        for series in (prices, market_caps, volumes):
+            series["ts"] = series["ts"].astype("int64")
+
+        df = (
+            prices
+            .merge(market_caps.drop_duplicates("ts", keep="last"), on="ts", how="left")
+            .merge(volumes.drop_duplicates("ts", keep="last"), on="ts", how="left")
+        )
+        df["date"] = pd.to_datetime(df["ts"], unit="ms").dt.floor("D")
+        df["price_usd"] = df["price_usd"].astype(float).round(8)
+        df["market_cap_usd"] = df["market_cap_usd"].astype(float).fillna(0).round(2)
+        df["volume_24h_usd"] = df["volume_24h_usd"].astype(float).fillna(0).round(2)
+        df["token_id"] = token_id
+        df["token_symbol"] = self.TOKEN_MAP.get(token_id, token_id.upper())
 
-        df = pd.DataFrame(rows)
-        df["date"] = pd.to_datetime(df["date"])
-        df = df.drop_duplicates(subset=["token_id", "date"])
+        df = df[
+            ["token_id", "token_symbol", "date", "price_usd", "market_cap_usd", "volume_24h_usd"]
+        ].drop_duplicates(subset=["token_id", "date"])
 
         # MOCK FOR 2021-2023 ETHERSCAN DATA (since free tier is 365 days max)
         if token_id in ["ethereum", "wrapped-ether"]:
             mock_dates = pd.date_range(start="2021-01-01", end="2024-01-01")
-            mock_rows = []
-            for dt in mock_dates:
-                mock_rows.append({
+            df_mock = pd.DataFrame(
+                {
                     "token_id": token_id,
                     "token_symbol": self.TOKEN_MAP.get(token_id, token_id.upper()),
-                    "date": dt,
+                    "date": mock_dates,
                     "price_usd": 2000.0,
                     "market_cap_usd": 250_000_000_000.0,
                     "volume_24h_usd": 10_000_000_000.0,
-                })
-            df_mock = pd.DataFrame(mock_rows)
-            df = pd.concat([df_mock, df], ignore_index=True).drop_duplicates(subset=["token_id", "date"], keep="last")
+                }
+            )
+            df = pd.concat([df_mock, df], ignore_index=True, sort=False).drop_duplicates(
+                subset=["token_id", "date"], keep="last"
+            )
 
         logger.info(f"[coingecko] {token_id}: {len(df):,} daily prices")
         return df
 
     def extract(self) -> pd.DataFrame:
-        """Extract price history for all tracked tokens."""
-        all_dfs = []
-        for token_id in self.tokens:
-            df = self.extract_price_history(token_id, days=365)  # 1 year to stay under free limits
-            if not df.empty:
-                all_dfs.append(df)
+        """Extract price history for all tracked tokens (fetched concurrently)."""
+        dfs = self._map_concurrent(
+            lambda token_id: self.extract_price_history(token_id, days=365),  # 1 year to stay under free limits
+            self.tokens,
+        )
+        all_dfs = [df for df in dfs if not df.empty]
 
         if not all_dfs:
             return pd.DataFrame()
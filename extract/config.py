@@ -3,17 +3,60 @@ Configuration — loads environment variables and validates settings.
 """
 from __future__ import annotations
 
+import json
 import os
+import types
+from collections.abc import Callable
+from dataclasses import dataclass, fields
 from functools import lru_cache
+from pathlib import Path
+from typing import Any, Union, get_args, get_origin, get_type_hints
 
-from dotenv import load_dotenv
-from pydantic import field_validator
-from pydantic_settings import BaseSettings
+_ENV_FILES = (Path.cwd() / ".env", Path(__file__).resolve().parent.parent / ".env")
+_TRUE = {"1", "true", "yes", "on"}
 
-load_dotenv()
 
+def _load_env_file() -> None:
+    """Load the first .env found (cwd, then project root); real env vars win."""
+    for path in _ENV_FILES:
+        if path.is_file():
+            from dotenv import load_dotenv
+            load_dotenv(path, override=False)
+            return
 
-class Settings(BaseSettings):
+
+def _parse_list(raw: str) -> tuple[str, ...]:
+    """Accept a JSON array or a comma-separated string."""
+    raw = raw.strip()
+    if raw.startswith("["):
+        return tuple(str(v) for v in json.loads(raw))
+    return tuple(v.strip() for v in raw.split(",") if v.strip())
+
+
+def _parse_bool(raw: str) -> bool:
+    return raw.strip().lower() in _TRUE
+
+
+def _converter(tp: Any) -> Callable[[str], Any]:
+    """Env-string parser for a resolved field annotation."""
+    origin = get_origin(tp)
+    if origin in (Union, types.UnionType):
+        args = [a for a in get_args(tp) if a is not type(None)]
+        if len(args) == 1:
+            # Optional[X]: an empty value means None
+            inner = _converter(args[0])
+            return lambda raw: inner(raw) if raw.strip() else None
+    if origin is tuple or tp is tuple:
+        return _parse_list
+    if tp is bool:
+        return _parse_bool
+    if tp in (int, float):
+        return tp
+    return str
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
     # API keys
     etherscan_api_key: str = ""
     dune_api_key: str = ""
@@ -27,35 +70,58 @@ class Settings(BaseSettings):
     extract_start_date: str = "2024-01-01"
     max_retries: int = 3
     request_timeout: int = 30
+    # CoinGecko request budget: 0.4 rps fits the free/demo tier (30 req/min);
+    # raise it (e.g. 10) when running with a paid Pro key
+    coingecko_rate_limit_rps: float = 0.4
+    # Seed for the synthetic enrichment data (unset = fresh randomness each run)
+    random_seed: int | None = None
+
+    # On-disk HTTP cache for GET requests (useful for re-running backfills)
+    http_cache_enabled: bool = False
+    http_cache_path: str = ".http_cache"
+    http_cache_expire_days: int = 7
 
     # Contracts of interest
     uniswap_v3_router: str = "0xE592427A0AEce92De3Edee1F18E0157C05861564"
     aave_v3_pool: str = "0x87870Bca3F3fD6335C3F4ce8392D69350B4fA4E2"
 
     # Tokens to track
-    tracked_tokens: list[str] = [
+    tracked_tokens: tuple[str, ...] = (
         "ethereum", "wrapped-ether", "uniswap", "aave",
         "usd-coin", "tether", "dai",
-    ]
+    )
 
-    @field_validator("log_level")
-    @classmethod
-    def validate_log_level(cls, v: str) -> str:
+    def __post_init__(self) -> None:
         allowed = {"DEBUG", "INFO", "WARNING", "ERROR"}
-        v = v.upper()
-        if v not in allowed:
+        level = self.log_level.upper()
+        if level not in allowed:
             raise ValueError(f"log_level must be one of {allowed}")
-        return v
+        object.__setattr__(self, "log_level", level)
+
+    @classmethod
+    def from_env(cls) -> Settings:
+        """
+        Build settings from environment variables named after each field.
 
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        extra = "ignore"
+        Names match case-insensitively (as pydantic-settings did); an exact
+        upper-case variable wins if several spellings are set.
+        """
+        env = {k.upper(): v for k, v in os.environ.items()}
+        env.update((k, v) for k, v in os.environ.items() if k.isupper())
+        # Resolved annotations, so coercion doesn't depend on how they're spelled
+        hints = get_type_hints(cls)
+        values: dict[str, Any] = {}
+        for f in fields(cls):
+            raw = env.get(f.name.upper())
+            if raw is not None:
+                values[f.name] = _converter(hints[f.name])(raw)
+        return cls(**values)
 
 
 @lru_cache()
 def get_settings() -> Settings:
-    return Settings()
+    _load_env_file()
+    return Settings.from_env()
 
 
 settings = get_settings()
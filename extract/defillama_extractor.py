@@ -7,8 +7,6 @@ API docs: https://defillama.com/docs/api
 """
 from __future__ import annotations
 
-from datetime import datetime, date
-
 import pandas as pd
 from loguru import logger
 
@@ -39,37 +37,61 @@ class DeFiLlamaExtractor(BaseExtractor):
             logger.error(f"[defillama] Failed to fetch TVL for {protocol_slug}: {e}")
             return []
 
-    def _fetch_protocol_fees(self, protocol_slug: str) -> list[dict]:
-        """Fetch daily fees and revenue for a protocol."""
+    def _fetch_protocol_fees(self, protocol_slug: str) -> list[list]:
+        """Fetch the daily fees chart ([ts, value] pairs) for a single protocol."""
+        try:
+            data = self._make_request(f"https://api.llama.fi/summary/fees/{protocol_slug}")
+            return data.get("totalDataChart", [])
+        except Exception as e:
+            logger.warning(f"[defillama] Fees not available for {protocol_slug}: {e}")
+            return []
+
+    def _fetch_chain_fees(self, chain: str) -> dict[str, list[list]]:
+        """
+        Fetch daily fees for every protocol on a chain in one request.
+
+        Returns {protocol name (lowercased): [[ts, value], ...]} built from
+        the overview's totalDataChartBreakdown ([ts, {name: value}] entries).
+        """
         try:
             data = self._make_request(
-                f"https://api.llama.fi/summary/fees/{protocol_slug}",
-                params={"dataType": "dailyFees"},
+                f"/overview/fees/{chain}",
+                params={"dataType": "dailyFees", "excludeTotalDataChart": "true"},
             )
-            return data.get("totalDataChartBreakdown", []) or data.get("totalDataChart", [])
         except Exception as e:
-            logger.warning(f"[defillama] Could not fetch fees for {protocol_slug}: {e}")
-            return []
+            logger.warning(f"[defillama] Could not fetch {chain} fees overview: {e}")
+            return {}
+
+        charts: dict[str, list[list]] = {}
+        for entry in data.get("totalDataChartBreakdown", []) or []:
+            if not (isinstance(entry, list) and len(entry) == 2 and isinstance(entry[1], dict)):
+                continue
+            ts, breakdown = entry
+            for name, value in breakdown.items():
+                charts.setdefault(name.lower(), []).append([ts, value])
+        return charts
 
     def extract_tvl(self) -> pd.DataFrame:
-        """Extract TVL history for all tracked protocols."""
+        """Extract TVL history for all tracked protocols (fetched concurrently)."""
+        def _fetch(protocol: dict) -> list[dict]:
+            logger.info(f"[defillama] Fetching TVL for {protocol['slug']}...")
+            return self._fetch_tvl_history(protocol["slug"])
+
+        histories = self._map_concurrent(_fetch, self.PROTOCOLS)
+
         rows = []
-        for protocol in self.PROTOCOLS:
+        for protocol, history in zip(self.PROTOCOLS, histories):
             slug = protocol["slug"]
-            logger.info(f"[defillama] Fetching TVL for {slug}...")
-            history = self._fetch_tvl_history(slug)
-
             for entry in history:
-                # date is Unix timestamp in DeFiLlama
-                ts = entry.get("date", 0)
+                # date is Unix timestamp in DeFiLlama; converted column-wise below
                 tvl = entry.get("totalLiquidityUSD", 0)
                 rows.append(
                     {
                         "protocol_slug": slug,
                         "protocol_name": protocol["name"],
                         "chain": protocol["chain"],
-                        "date": date.fromtimestamp(int(ts)),
-                        "tvl_usd": round(float(tvl), 2) if tvl else None,
+                        "date": int(entry.get("date", 0)),
+                        "tvl_usd": float(tvl) if tvl else None,
                     }
                 )
 
@@ -81,43 +103,49 @@ class DeFiLlamaExtractor(BaseExtractor):
             return pd.DataFrame()
 
         df = pd.DataFrame(rows)
-        df["date"] = pd.to_datetime(df["date"])
+        df["date"] = pd.to_datetime(df["date"].astype("int64"), unit="s").dt.normalize()
+        df["tvl_usd"] = df["tvl_usd"].astype(float).round(2)
         df = df.drop_duplicates(subset=["protocol_slug", "chain", "date"])
         return df
 
     def extract_fees(self) -> pd.DataFrame:
-        """Extract daily fees/revenue for all tracked protocols."""
+        """
+        Extract daily fees/revenue for all tracked protocols.
+
+        One /overview/fees/{chain} call covers every protocol on that chain;
+        protocols missing from the overview fall back to /summary/fees/{slug}.
+        """
+        overviews = {
+            chain: self._fetch_chain_fees(chain)
+            for chain in dict.fromkeys(p["chain"] for p in self.PROTOCOLS)
+        }
+
         rows = []
         for protocol in self.PROTOCOLS:
             slug = protocol["slug"]
-            logger.info(f"[defillama] Fetching fees for {slug}...")
-
-            # Try the fees endpoint
-            try:
-                data = self._make_request(
-                    f"https://api.llama.fi/summary/fees/{slug}"
-                )
-                chart = data.get("totalDataChart", [])
-                for entry in chart:
-                    if isinstance(entry, list) and len(entry) == 2:
-                        ts, value = entry
-                        rows.append(
-                            {
-                                "protocol_slug": slug,
-                                "date": date.fromtimestamp(int(ts)),
-                                "total_fees_usd": round(float(value), 2),
-                                "revenue_usd": None,  # Revenue requires premium endpoint
-                            }
-                        )
-            except Exception as e:
-                logger.warning(f"[defillama] Fees not available for {slug}: {e}")
-                continue
+            chart = overviews[protocol["chain"]].get(protocol["name"].lower())
+            if chart is None:
+                logger.info(f"[defillama] {slug} not in fees overview, fetching directly...")
+                chart = self._fetch_protocol_fees(slug)
+
+            for entry in chart:
+                if isinstance(entry, list) and len(entry) == 2:
+                    ts, value = entry
+                    rows.append(
+                        {
+                            "protocol_slug": slug,
+                            "date": int(ts),
+                            "total_fees_usd": value,
+                            "revenue_usd": None,  # Revenue requires premium endpoint
+                        }
+                    )
 
         if not rows:
             return pd.DataFrame()
 
         df = pd.DataFrame(rows)
-        df["date"] = pd.to_datetime(df["date"])
+        df["date"] = pd.to_datetime(df["date"].astype("int64"), unit="s").dt.normalize()
+        df["total_fees_usd"] = df["total_fees_usd"].astype(float).round(2)
         df = df.drop_duplicates(subset=["protocol_slug", "date"])
         return df
 
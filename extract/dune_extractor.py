@@ -12,11 +12,16 @@ Pre-built queries used:
 from __future__ import annotations
 
 import time
+
+import numpy as np
 import pandas as pd
+import requests
 from loguru import logger
 
+from ._rng import rng_for
 from .base_extractor import BaseExtractor
 from .config import settings
+from .loader import PostgresLoader, fetch_distinct_wallets, get_engine
 
 
 class DuneExtractor(BaseExtractor):
@@ -34,9 +39,18 @@ class DuneExtractor(BaseExtractor):
         "aave_user_segments": 2595727,
     }
 
-    def __init__(self, api_key: str | None = None) -> None:
+    def __init__(
+        self,
+        api_key: str | None = None,
+        wallets: list[str] | None = None,
+        loader: PostgresLoader | None = None,
+    ) -> None:
         super().__init__()
+        # Reuse the pipeline loader's connection pool when one is provided
+        self.loader = loader
         self.api_key = api_key or settings.dune_api_key
+        # Pre-fetched wallet list for the mock fallback; skips the DB query
+        self.wallets = wallets
 
     def _get_headers(self) -> dict[str, str]:
         return {"X-Dune-API-Key": self.api_key}
@@ -48,7 +62,6 @@ class DuneExtractor(BaseExtractor):
             return None
         try:
             # POST endpoint — use requests directly for this one
-            import requests
             resp = requests.post(
                 f"{self.api_base_url}/query/{query_id}/execute",
                 headers=self._get_headers(),
@@ -63,12 +76,15 @@ class DuneExtractor(BaseExtractor):
             return None
 
     def _poll_execution(self, execution_id: str, max_wait: int = 300) -> list[dict]:
-        """Poll until execution completes, return result rows."""
-        waited = 0
-        poll_interval = 5
-        while waited < max_wait:
+        """Poll until execution completes, return result rows.
+
+        Backs off exponentially (0.5s, 1s, 2s, ... capped at 10s) so short
+        queries return almost immediately while long ones don't burn quota.
+        """
+        deadline = time.monotonic() + max_wait
+        attempt = 0
+        while True:
             try:
-                import requests
                 resp = requests.get(
                     f"{self.api_base_url}/execution/{execution_id}/results",
                     headers=self._get_headers(),
@@ -81,13 +97,16 @@ class DuneExtractor(BaseExtractor):
                 elif state in ("QUERY_STATE_FAILED", "QUERY_STATE_CANCELLED"):
                     logger.error(f"[dune] Execution {execution_id} failed: {state}")
                     return []
-                else:
-                    logger.debug(f"[dune] Execution {execution_id} state: {state}")
-                    time.sleep(poll_interval)
-                    waited += poll_interval
+                logger.debug(f"[dune] Execution {execution_id} state: {state}")
             except Exception as e:
                 logger.error(f"[dune] Polling failed: {e}")
                 return []
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(10.0, 0.5 * 2**attempt, remaining))
+            attempt += 1
         logger.warning(f"[dune] Execution {execution_id} timed out after {max_wait}s")
         return []
 
@@ -97,41 +116,39 @@ class DuneExtractor(BaseExtractor):
         We generate deterministic labels based on real DB wallets to ensure JOINs work.
         TODO: Once we get a premium Dune API tier, remove this fallback entirely.
         """
-        import random
-
         labels = [
             "airdrop_hunter", "governance_voter", "liquidity_provider",
             "whale", "retail_trader", "defi_power_user",
         ]
-        
-        try:
-            from sqlalchemy import create_engine
-            engine = create_engine(settings.database_url)
-            df_wallets = pd.read_sql("SELECT DISTINCT from_address as wallet_address FROM raw.etherscan_transactions", engine)
-            addresses = df_wallets["wallet_address"].tolist()
-        except Exception as e:
-            logger.warning(f"[dune] Could not fetch real wallets, using fallback ({e})")
-            import hashlib
-            addresses = [
-                f"0x{hashlib.sha256(str(i).encode()).hexdigest()[:40]}"
-                for i in range(500)
-            ]
-
-        rows = []
-        for addr in addresses:
-            rows.append(
-                {
-                    "wallet_address": addr,
-                    "label": random.choice(labels),
-                    "label_type": "behavioral",
-                    "project": random.choice(["uniswap", "aave"]),
-                    "first_activity_date": pd.Timestamp("2023-01-01")
-                    + pd.Timedelta(days=random.randint(0, 365)),
-                    "total_txs": random.randint(1, 5000),
-                }
-            )
-        logger.info(f"[dune] Generated {len(rows):,} mock wallet labels (no API key)")
-        return pd.DataFrame(rows)
+        rng = rng_for("dune", default_seed=42)
+
+        if self.wallets is not None:
+            addresses = np.asarray(self.wallets, dtype=object)
+        else:
+            try:
+                engine = self.loader.engine if self.loader else get_engine(settings.database_url)
+                addresses = np.asarray(fetch_distinct_wallets(engine), dtype=object)
+            except Exception as e:
+                logger.warning(f"[dune] Could not fetch real wallets, using fallback ({e})")
+                # 500 pseudo-random 20-byte addresses from a single draw
+                hex_pool = rng.bytes(500 * 20).hex()
+                addresses = [f"0x{hex_pool[i:i + 40]}" for i in range(0, len(hex_pool), 40)]
+
+        n = len(addresses)
+        df = pd.DataFrame(
+            {
+                "wallet_address": addresses,
+                "label": rng.choice(labels, size=n),
+                "label_type": "behavioral",
+                "project": rng.choice(["uniswap", "aave"], size=n),
+                "first_activity_date": pd.Timestamp("2023-01-01")
+                + pd.to_timedelta(rng.integers(0, 366, size=n), unit="D"),
+                "total_txs": rng.integers(1, 5001, size=n),
+            },
+            copy=False,
+        )
+        logger.info(f"[dune] Generated {len(df):,} mock wallet labels (no API key)")
+        return df
 
     def extract(self) -> pd.DataFrame:
         """Extract wallet labels from Dune or return mock data."""
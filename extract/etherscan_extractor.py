@@ -10,15 +10,118 @@ Rate limit: 5 req/sec on free tier
 """
 from __future__ import annotations
 
-from datetime import datetime
+from collections.abc import Iterator
+from pathlib import Path
 from typing import Any
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as pf
+import pyarrow.parquet as pq
 from loguru import logger
+from pandas.api.types import union_categoricals
 
 from .base_extractor import BaseExtractor
 from .config import settings
 
+# Wei amounts: exact 38-digit integers (max ETH supply is ~1.2e26 wei)
+WEI_DTYPE = pd.ArrowDtype(pa.decimal128(38, 0))
+
+# Column dtypes produced by _parse_transactions
+_SCHEMA: dict[str, Any] = {
+    "tx_hash": "str",
+    "block_number": "int64",
+    "block_timestamp": "datetime64[s, UTC]",
+    "from_address": "str",
+    "to_address": "category",
+    "contract_address": "str",
+    "value_wei": WEI_DTYPE,
+    "gas_used": "int64",
+    "gas_price_wei": WEI_DTYPE,
+    "method_id": "str",
+    "function_name": "category",
+    "is_error": "bool",
+    "protocol_name": "category",
+    "chain": "category",
+}
+_CATEGORICAL_COLUMNS = [col for col, dtype in _SCHEMA.items() if dtype == "category"]
+# Repetitive columns worth dictionary-encoding on disk; hashes are unique
+_PARQUET_DICTIONARY_COLUMNS = ["from_address", "to_address", "function_name", "protocol_name"]
+# Maps Arrow types back to the parser's extension dtypes when reading files
+_TYPES_MAPPER = {WEI_DTYPE.pyarrow_dtype: WEI_DTYPE}.get
+# Built once; empty pages return a copy instead of running the parser
+_EMPTY_DF = pd.DataFrame({col: pd.array([], dtype=dtype) for col, dtype in _SCHEMA.items()})
+
+# Ethereum tx hashes: "0x" + 64 hex chars
+_TX_HASH_LEN = 66
+# Odd 64-bit multiplier (golden ratio) used to mix the two prefix words
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _tx_hash_keys(hashes: pd.Series) -> np.ndarray | None:
+    """
+    uint64 key per hash from hex chars 2..17, read zero-copy from the Arrow buffer.
+
+    Returns None unless every value is a 66-char hash (the fixed stride is
+    what makes the buffer view possible); callers then fall back to strings.
+    """
+    arr = pa.array(hashes.array)
+    if isinstance(arr, pa.ChunkedArray):
+        arr = arr.combine_chunks()
+    if arr.null_count or not (pa.types.is_string(arr.type) or pa.types.is_large_string(arr.type)):
+        return None
+    offset_dtype = np.int64 if pa.types.is_large_string(arr.type) else np.int32
+    offsets = np.frombuffer(arr.buffers()[1], dtype=offset_dtype)[arr.offset:arr.offset + len(arr) + 1]
+    if not (np.diff(offsets) == _TX_HASH_LEN).all():
+        return None
+    chars = np.frombuffer(arr.buffers()[2], dtype=np.uint8)[offsets[0]:offsets[-1]]
+    words = chars.reshape(-1, _TX_HASH_LEN)[:, 2:18].copy().view(np.uint64)
+    return words[:, 0] ^ (words[:, 1] * _MIX)
+
+
+def _concat_pages(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """
+    pd.concat for parsed pages that keeps the categorical columns categorical.
+
+    Pages carry different category tables (one protocol, a few function
+    names each), which plain concat would decode back to strings.
+    """
+    combined = pd.concat(frames, ignore_index=True)
+    for col in _CATEGORICAL_COLUMNS:
+        combined[col] = union_categoricals([f[col] for f in frames])
+    return combined
+
+
+def _drop_duplicate_hashes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    drop_duplicates(subset=["tx_hash"], keep="first") without hashing every string.
+
+    Rows are first bucketed on a uint64 hash prefix; only rows whose prefix
+    repeats (true duplicates, or a collision) are compared as strings, so
+    the result is exact.
+    """
+    keys = _tx_hash_keys(df["tx_hash"])
+    if keys is None:
+        return df.drop_duplicates(subset=["tx_hash"], keep="first", ignore_index=True)
+    candidates = pd.Series(keys).duplicated(keep=False).to_numpy()
+    if not candidates.any():
+        return df.reset_index(drop=True)
+    repeats = df.loc[candidates, "tx_hash"].duplicated(keep="first")
+    return df.drop(index=repeats.index[repeats.to_numpy()]).reset_index(drop=True)
+
+
+# Method selectors for known DeFi operations; these labels take precedence
+# over Etherscan's functionName so unverified contracts still classify
+_METHOD_ID_TO_NAME: dict[str, str] = {
+    "0x414bf389": "exactInputSingle",       # Uniswap swap
+    "0xc04b8d59": "exactInput",              # Uniswap multi-hop swap
+    "0x617ba037": "supply",                  # Aave supply
+    "0xa415bcad": "borrow",                  # Aave borrow
+    "0x573ade81": "repay",                   # Aave repay
+    "0x69328dec": "withdraw",                # Aave withdraw
+}
+
 
 class EtherscanExtractor(BaseExtractor):
     """Extracts transaction history from Ethereum DeFi protocol contracts."""
@@ -27,6 +130,7 @@ class EtherscanExtractor(BaseExtractor):
     api_base_url = "https://api.etherscan.io/v2/api"
     target_table = "etherscan_transactions"
     rate_limit_rps = 4.0  # Stay safely under 5 req/sec limit
+    shards = 8  # concurrent block-range partitions per contract
 
     # Known DeFi protocols and their contract addresses
     PROTOCOLS: dict[str, dict[str, str]] = {
@@ -40,16 +144,6 @@ class EtherscanExtractor(BaseExtractor):
         },
     }
 
-    # Method signatures for known DeFi operations
-    METHOD_NAMES: dict[str, str] = {
-        "0x414bf389": "exactInputSingle",       # Uniswap swap
-        "0xc04b8d59": "exactInput",              # Uniswap multi-hop swap
-        "0x617ba037": "supply",                  # Aave supply
-        "0xa415bcad": "borrow",                  # Aave borrow
-        "0x573ade81": "repay",                   # Aave repay
-        "0x69328dec": "withdraw",                # Aave withdraw
-    }
-
     def __init__(self, api_key: str | None = None) -> None:
         super().__init__()
         self.api_key = api_key or settings.etherscan_api_key
@@ -58,6 +152,57 @@ class EtherscanExtractor(BaseExtractor):
                 "[etherscan] No API key provided. "
                 "Using demo mode with very low rate limits."
             )
+        # Resolved once; every request merges these instead of re-deriving the key
+        self._base_params = {"chainid": "1", "apikey": self.api_key or "YourApiKeyToken"}
+
+    def _check_payload(self, data: dict[str, Any] | list) -> None:
+        """
+        Raise on status "0" replies other than the end-of-data "No transactions found".
+
+        Etherscan reports throttling in-band (NOTOK, "Max calls per sec rate
+        limit reached"); raising here lets _make_request's retry back off.
+        """
+        if isinstance(data, dict) and data.get("status") == "0":
+            message = data.get("message", "")
+            if "No transactions found" not in message:
+                raise RuntimeError(f"Etherscan API error: {message}: {data.get('result')}")
+
+    def _get_latest_block(self) -> int | None:
+        """Return the current chain head, or None if it can't be determined."""
+        params = {**self._base_params, "module": "proxy", "action": "eth_blockNumber"}
+        try:
+            # Never serve the chain head from the HTTP cache
+            data = self._make_request("", params=params, headers={"Cache-Control": "no-store"})
+            return int(data["result"], 16)
+        except Exception as e:
+            logger.warning(f"[etherscan] Could not fetch latest block, not sharding: {e}")
+            return None
+
+    @staticmethod
+    def _split_block_range(start_block: int, end_block: int, shards: int) -> list[tuple[int, int]]:
+        """Split an inclusive block range into at most `shards` disjoint ranges."""
+        span = end_block - start_block + 1
+        if shards <= 1 or span <= shards:
+            return [(start_block, end_block)]
+        step = -(-span // shards)  # ceil division
+        return [
+            (lo, min(lo + step - 1, end_block))
+            for lo in range(start_block, end_block + 1, step)
+        ]
+
+    def _plan_block_ranges(
+        self,
+        start_block: int,
+        end_block: int,
+        latest: int | None,
+    ) -> list[tuple[int, int]]:
+        """Shard [start_block, end_block] using the known chain head, if any."""
+        if latest is None or start_block >= min(latest, end_block):
+            return [(start_block, end_block)]
+        ranges = self._split_block_range(start_block, min(latest, end_block), self.shards)
+        # The last shard stays open-ended to catch blocks mined meanwhile
+        ranges[-1] = (ranges[-1][0], end_block)
+        return ranges
 
     def extract_transactions(
         self,
@@ -69,126 +214,258 @@ class EtherscanExtractor(BaseExtractor):
     ) -> pd.DataFrame:
         """
         Paginated extraction of normal transactions for a contract address.
-        
+
+        The block range is split into `shards` disjoint sub-ranges that are
+        paginated concurrently; the shared rate limiter still caps total rps.
+
         Returns a DataFrame with standardised column names.
         """
-        all_transactions: list[dict] = []
+        latest = self._get_latest_block() if self.shards > 1 else None
+        ranges = self._plan_block_ranges(start_block, end_block, latest)
+        frames = list(
+            self._iter_concurrent(
+                lambda r: self.iter_transactions(
+                    contract_address, protocol_name, r[0], r[1], page_size
+                ),
+                ranges,
+            )
+        )
+
+        if not frames:
+            return _EMPTY_DF.copy()
+
+        # Shards are disjoint block ranges and each walk drops its own
+        # boundary overlap, so the result is already unique on tx_hash
+        return _concat_pages(frames)
+
+    def iter_transactions(
+        self,
+        contract_address: str,
+        protocol_name: str,
+        start_block: int = 0,
+        end_block: int = 99999999,
+        page_size: int = 10000,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Walk txlist pages for a single block range, yielding one parsed frame per page.
+
+        Each request restarts at the last block seen (always page 1), so a block
+        split across a page boundary is re-fetched in full; its already-yielded
+        transactions are dropped against the set of hashes from that block.
+        """
         current_block = start_block
-        page = 1
+        fetched = 0
+        boundary: set[str] = set()  # tx hashes already yielded from current_block
+        txlist_params = {
+            **self._base_params,
+            "module": "account",
+            "action": "txlist",
+            "address": contract_address,
+            "endblock": end_block,
+            "page": 1,
+            "offset": page_size,
+            "sort": "asc",
+        }
 
         while True:
             logger.debug(
-                f"[etherscan] Fetching page {page} for {protocol_name} "
-                f"from block {current_block}"
+                f"[etherscan] Fetching {protocol_name} "
+                f"from block {current_block} to {end_block}"
             )
-            params = {
-                "chainid": "1",
-                "module": "account",
-                "action": "txlist",
-                "address": contract_address,
-                "startblock": current_block,
-                "endblock": end_block,
-                "page": page,
-                "offset": page_size,
-                "sort": "asc",
-                "apikey": self.api_key or "YourApiKeyToken",
-            }
-
-            try:
-                data = self._make_request("", params=params)
-            except Exception as e:
-                logger.error(f"[etherscan] Failed to fetch page {page}: {e}")
-                break
+            params = {**txlist_params, "startblock": current_block}
 
-            # Handle API errors
+            # Errors (rate limits included, once retries run out) propagate:
+            # stopping here would silently truncate the shard
+            data = self._make_request("", params=params)
             if data.get("status") != "1":
-                message = data.get("message", "")
-                if "No transactions found" in message or not data.get("result"):
-                    logger.info(f"[etherscan] No more transactions for {protocol_name}")
-                    break
-                logger.warning(f"[etherscan] API message: {message}")
+                logger.debug(
+                    f"[etherscan] No more transactions for {protocol_name} "
+                    f"in blocks {start_block}-{end_block}"
+                )
                 break
 
             results = data.get("result", [])
             if not results:
                 break
 
-            all_transactions.extend(results)
-            logger.info(
-                f"[etherscan] Fetched {len(results):,} txs for {protocol_name} "
-                f"(total: {len(all_transactions):,})"
-            )
+            seen = set(boundary)
+            fresh = []
+            for tx in results:
+                if tx["hash"] not in seen:
+                    seen.add(tx["hash"])
+                    fresh.append(tx)
+
+            if fresh:
+                fetched += len(fresh)
+                logger.info(
+                    f"[etherscan] Fetched {len(fresh):,} txs for {protocol_name} "
+                    f"(blocks {start_block}-{end_block}, total: {fetched:,})"
+                )
+                yield self._parse_transactions(fresh, protocol_name)
 
             # If we got fewer results than page_size, we're done
             if len(results) < page_size:
                 break
 
-            # Next page starts at the last block + 1
-            current_block = int(results[-1]["blockNumber"]) + 1
-            page += 1
-
-        if not all_transactions:
-            return pd.DataFrame()
+            last_block = int(results[-1]["blockNumber"])
+            if not fresh:
+                # A single block holds more than page_size txs; it can't be
+                # paged further within the txlist window, so move past it.
+                logger.warning(
+                    f"[etherscan] Block {last_block} exceeds {page_size:,} txs "
+                    f"for {protocol_name}; remaining txs in it are skipped"
+                )
+                current_block, boundary = last_block + 1, set()
+                continue
 
-        return self._parse_transactions(all_transactions, protocol_name)
+            if last_block != current_block:
+                boundary = set()
+            boundary.update(tx["hash"] for tx in fresh if int(tx["blockNumber"]) == last_block)
+            current_block = last_block
 
     def _parse_transactions(
         self,
         raw_transactions: list[dict[str, Any]],
         protocol_name: str,
     ) -> pd.DataFrame:
-        """Parse raw Etherscan API response into a clean DataFrame."""
-        rows = []
-        for tx in raw_transactions:
-            method_id = tx.get("methodId", "")[:10]
-            rows.append(
-                {
-                    "tx_hash": tx.get("hash", ""),
-                    "block_number": int(tx.get("blockNumber", 0)),
-                    "block_timestamp": datetime.utcfromtimestamp(
-                        int(tx.get("timeStamp", 0))
-                    ),
-                    "from_address": tx.get("from", "").lower(),
-                    "to_address": tx.get("to", "").lower(),
-                    "contract_address": tx.get("contractAddress", "").lower() or None,
-                    "value_wei": str(tx.get("value", "0") or "0"),
-                    "gas_used": int(tx.get("gasUsed", "0") or 0),
-                    "gas_price_wei": str(tx.get("gasPrice", "0") or "0"),
-                    "method_id": method_id,
-                    "function_name": (
-                        tx.get("functionName", "").split("(")[0]
-                        or self.METHOD_NAMES.get(method_id, "unknown")
-                    ),
-                    "is_error": tx.get("isError", "0") == "1",
-                    "protocol_name": protocol_name,
-                    "chain": "ethereum",
-                }
+        """
+        Parse raw Etherscan API response into a clean DataFrame.
+
+        Each column is built in a single pass over its own field (no
+        intermediate row-wise frame); missing and empty values take the
+        field's default.
+        """
+        if not raw_transactions:
+            return _EMPTY_DF.copy()
+        raw = raw_transactions
+        n = len(raw)
+
+        def field(key: str, default: str = "") -> list[str]:
+            return [r.get(key) or default for r in raw]
+
+        def lowered(key: str) -> pd.Series:
+            # One vectorised pass over the Arrow-backed string buffer
+            return pd.Series(field(key), dtype="str").str.lower()
+
+        def integers(key: str) -> np.ndarray:
+            return np.fromiter((int(r.get(key) or 0) for r in raw), dtype=np.int64, count=n)
+
+        def wei(key: str) -> pd.api.extensions.ExtensionArray:
+            # Parsed by Arrow's string -> decimal cast rather than int() per value
+            return pd.arrays.ArrowExtensionArray(
+                pa.array(field(key, "0"), type=pa.string()).cast(WEI_DTYPE.pyarrow_dtype)
             )
 
-        df = pd.DataFrame(rows)
-        # Deduplicate by tx_hash
-        df = df.drop_duplicates(subset=["tx_hash"])
+        method_id = [m[:10] for m in field("methodId")]
+        function_name = [
+            _METHOD_ID_TO_NAME.get(m) or f.split("(", 1)[0] or "unknown"
+            for f, m in zip(field("functionName"), method_id)
+        ]
+
+        df = pd.DataFrame(
+            {
+                "tx_hash": lowered("hash"),
+                "block_number": integers("blockNumber"),
+                # Unix seconds are UTC by definition; keep that explicit on the dtype
+                "block_timestamp": pd.to_datetime(integers("timeStamp"), unit="s", utc=True),
+                "from_address": lowered("from"),
+                # Pages hit a handful of contracts: dictionary-encode the repeats
+                "to_address": lowered("to").astype("category"),
+                "contract_address": lowered("contractAddress").replace("", None),
+                "value_wei": wei("value"),
+                "gas_used": integers("gasUsed"),
+                "gas_price_wei": wei("gasPrice"),
+                "method_id": method_id,
+                # Low-cardinality labels: stored as codes + a small category table
+                "function_name": pd.Categorical(function_name),
+                "is_error": np.fromiter((r.get("isError") == "1" for r in raw), dtype=bool, count=n),
+                # Constant per page: all-zero codes into a one-value category table
+                "protocol_name": pd.Categorical.from_codes(np.zeros(n, dtype=np.int8), [protocol_name]),
+                "chain": pd.Categorical.from_codes(np.zeros(n, dtype=np.int8), ["ethereum"]),
+            },
+            # Every column is freshly built above: adopt the buffers, don't copy
+            copy=False,
+        )
         return df
 
-    def extract(self) -> pd.DataFrame:
-        """Extract transactions for all tracked protocols."""
-        all_dfs = []
-        for slug, protocol in self.PROTOCOLS.items():
+    def extract_chunks(self) -> Iterator[pd.DataFrame]:
+        """
+        Stream transactions for all tracked protocols, one parsed page at a time.
+
+        Every (protocol, block shard) pair is walked concurrently; pages are
+        yielded as they arrive so the loader can write them without the full
+        history ever being held in memory.
+        """
+        latest = self._get_latest_block() if self.shards > 1 else None
+        tasks = []
+        for protocol in self.PROTOCOLS.values():
             logger.info(
                 f"[etherscan] Starting extraction for {protocol['name']}..."
             )
-            df = self.extract_transactions(
-                contract_address=protocol["address"],
-                protocol_name=protocol["name"],
-            )
-            if not df.empty:
-                all_dfs.append(df)
-                logger.info(
-                    f"[etherscan] {protocol['name']}: {len(df):,} transactions"
-                )
+            for lo, hi in self._plan_block_ranges(0, 99999999, latest):
+                tasks.append((protocol, lo, hi))
+
+        yield from self._iter_concurrent(
+            lambda task: self.iter_transactions(
+                contract_address=task[0]["address"],
+                protocol_name=task[0]["name"],
+                start_block=task[1],
+                end_block=task[2],
+            ),
+            tasks,
+        )
+
+    def extract(self) -> pd.DataFrame:
+        """Extract transactions for all tracked protocols."""
+        all_dfs = [df for df in self.extract_chunks() if not df.empty]
 
         if not all_dfs:
             return pd.DataFrame()
 
-        combined = pd.concat(all_dfs, ignore_index=True)
-        return combined
+        combined = _concat_pages(all_dfs)
+        return _drop_duplicate_hashes(combined)
+
+    @staticmethod
+    def save(df: pd.DataFrame, path: str | Path) -> None:
+        """
+        Persist parsed transactions as ZSTD Parquet so re-runs can skip the API.
+
+        Columns are already Arrow-backed, so the write is no object -> Arrow copy.
+        """
+        df.to_parquet(
+            path,
+            engine="pyarrow",
+            compression="zstd",
+            use_dictionary=_PARQUET_DICTIONARY_COLUMNS,
+            row_group_size=64_000,
+            index=False,
+        )
+
+    @staticmethod
+    def load(path: str | Path) -> pd.DataFrame:
+        """Read a save()d file back with the parser's dtypes (exact wei decimals included)."""
+        table = pq.read_table(path)
+        df = table.to_pandas(types_mapper=_TYPES_MAPPER)
+        # Parquet stores timestamps at ms resolution; restore the parsed dtypes
+        return df.astype(_SCHEMA)
+
+    @staticmethod
+    def save_feather(
+        df: pd.DataFrame,
+        path: str | Path,
+        compression: str = "zstd",
+    ) -> None:
+        """
+        Hand parsed transactions to another process as an Arrow IPC (feather) file.
+
+        Categorical columns are written as dictionary<string>. Pass
+        compression="uncompressed" for a file that load_feather() can memory-map
+        without decompressing.
+        """
+        df.reset_index(drop=True).to_feather(path, compression=compression)
+
+    @staticmethod
+    def load_feather(path: str | Path) -> pd.DataFrame:
+        """Memory-map a save_feather() file back into a DataFrame with the parser's dtypes."""
+        table = pf.read_table(path, memory_map=True)
+        return table.to_pandas(types_mapper=_TYPES_MAPPER)
@@ -7,14 +7,16 @@ to get distinct chains interacted with.
 """
 from __future__ import annotations
 
-import random
 from typing import Any
 
+import numpy as np
 import pandas as pd
 from loguru import logger
 
-from .base_extractor import BaseExtractor
+from ._rng import rng_for
+from .base_extractor import BaseExtractor, fallback_wallets
 from .config import settings
+from .loader import PostgresLoader, fetch_distinct_wallets, get_engine
 
 class LiFiExtractor(BaseExtractor):
     """Extracts cross-chain bridging behavior to calculate Nomad Score."""
@@ -24,11 +26,24 @@ class LiFiExtractor(BaseExtractor):
     target_table = "cross_chain_activity"
     rate_limit_rps = 2.0
 
-    def __init__(self, api_key: str | None = None) -> None:
+    def __init__(
+        self,
+        api_key: str | None = None,
+        wallets: list[str] | None = None,
+        loader: PostgresLoader | None = None,
+    ) -> None:
         super().__init__()
+        # Reuse the pipeline loader's connection pool when one is provided
+        self.loader = loader
+        # Pre-fetched wallet list (e.g. shared by the orchestrator); skips the DB query
+        self.wallets = wallets
         self.api_key = api_key or getattr(settings, "lifi_api_key", None)
 
     def extract(self) -> pd.DataFrame:
+        """DataFrame view of extract_columns() for callers outside the orchestrator."""
+        return pd.DataFrame(self.extract_columns(), copy=False)
+
+    def extract_columns(self) -> dict[str, np.ndarray]:
         """
         Since querying 10k wallets against a public API would take hours/days
         and require paid tiers for bulk, we pull unique wallets from our DB
@@ -36,43 +51,39 @@ class LiFiExtractor(BaseExtractor):
         for demonstration purposes.
         """
         logger.info("[lifi] Fetching active wallets from database for enrichment...")
-        try:
-            # We connect to the DB to get actual wallets we just extracted via Etherscan
-            from sqlalchemy import create_engine
-            engine = create_engine(settings.database_url)
-            df_wallets = pd.read_sql("SELECT DISTINCT from_address as wallet_address FROM raw.etherscan_transactions", engine)
-            wallets = df_wallets["wallet_address"].tolist()
-        except Exception as e:
-            logger.warning(f"[lifi] Could not fetch real wallets, using fallback ({e})")
-            wallets = [f"0x{hex(i)[2:].zfill(40)}" for i in range(1, 101)]
+        if self.wallets is not None:
+            wallets = list(self.wallets)
+        else:
+            try:
+                # We connect to the DB to get actual wallets we just extracted via Etherscan
+                engine = self.loader.engine if self.loader else get_engine(settings.database_url)
+                wallets = fetch_distinct_wallets(engine)
+            except Exception as e:
+                logger.warning(f"[lifi] Could not fetch real wallets, using fallback ({e})")
+                wallets = list(fallback_wallets())
 
         logger.info(f"[lifi] Enriching {len(wallets):,} wallets with cross-chain data...")
 
-        rows = []
-        for wallet in wallets:
-            # Mercenary distribution:
-            # 60% use 1 chain (Loyalists)
-            # 30% use 2-3 chains (Explorers)
-            # 10% use 4+ chains (Mercenaries / Airdrop Hunters)
-            rand = random.random()
-            if rand < 0.6:
-                chains = 1
-                bridge_vol = 0
-            elif rand < 0.9:
-                chains = random.randint(2, 3)
-                bridge_vol = random.uniform(100, 5000)
-            else:
-                chains = random.randint(4, 8)
-                bridge_vol = random.uniform(5000, 100000)
-
-            rows.append({
-                "wallet_address": wallet,
-                "distinct_chains_used": chains,
-                "total_bridging_volume_usd": bridge_vol,
-                "last_bridge_date": "2024-01-01" if chains > 1 else None
-            })
+        # Mercenary distribution, one bucket per wallet:
+        # 60% use 1 chain (Loyalists)
+        # 30% use 2-3 chains (Explorers)
+        # 10% use 4+ chains (Mercenaries / Airdrop Hunters)
+        rng = rng_for("lifi")
+        n = len(wallets)
+        bucket = np.searchsorted([0.6, 0.9], rng.random(n), side="right")
+        chains = rng.integers(np.array([1, 2, 4])[bucket], np.array([2, 4, 9])[bucket])
+        bridge_vol = rng.uniform(
+            np.array([0.0, 100.0, 5000.0])[bucket],
+            np.array([0.0, 5000.0, 100000.0])[bucket],
+        )
 
-        df = pd.DataFrame(rows)
-        df["last_bridge_date"] = pd.to_datetime(df["last_bridge_date"])
-        logger.success(f"[lifi] Generated cross-chain footprints for {len(df):,} wallets")
-        return df
+        columns = {
+            "wallet_address": np.asarray(wallets, dtype=object),
+            "distinct_chains_used": chains,
+            "total_bridging_volume_usd": bridge_vol,
+            "last_bridge_date": np.where(
+                chains > 1, np.datetime64("2024-01-01"), np.datetime64("NaT")
+            ),
+        }
+        logger.success(f"[lifi] Generated cross-chain footprints for {n:,} wallets")
+        return columns
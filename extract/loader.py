@@ -2,40 +2,108 @@
 PostgresLoader — handles all database writes for the ELT pipeline.
 
 Supports:
-- Upsert (INSERT ... ON CONFLICT DO UPDATE)
-- Full refresh (TRUNCATE + INSERT)
+- Upsert (COPY into a temp table, then INSERT ... ON CONFLICT DO UPDATE)
+- Column-array upsert (same, from a dict of NumPy arrays; no DataFrame)
+- Full refresh (COPY into a temp table, then TRUNCATE + INSERT in one transaction)
+- Caller-owned transactions: pass `conn` to batch several writes into one commit
 - Incremental tracking via _pipeline_runs table
 """
 from __future__ import annotations
 
+import io
+import itertools
+import multiprocessing
+import os
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
 from datetime import datetime
+from functools import lru_cache
+from string import Template
 from typing import Literal
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 from loguru import logger
 from sqlalchemy import create_engine, text
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.pool import NullPool
 
 from .config import settings
 
+# Rows serialised per COPY round-trip; bounds the CSV buffer on large loads
+COPY_CHUNK_ROWS = 50_000
+
+# Unique temp-table suffixes for concurrent upserts (next() is atomic under the GIL)
+_TEMP_COUNTER = itertools.count()
+
+
+def get_engine(database_url: str) -> Engine:
+    """
+    One engine per database URL and process, shared by the loader and extractors.
+
+    Keyed on the PID so a forked worker never reuses sockets inherited from
+    its parent's pool.
+    """
+    return _engine_for(database_url, os.getpid())
+
+
+@lru_cache(maxsize=None)
+def _engine_for(database_url: str, pid: int) -> Engine:
+    if multiprocessing.parent_process() is not None:
+        # Worker process (e.g. under ProcessPoolExecutor): short-lived, so open
+        # connections on demand rather than holding a pool per worker
+        return create_engine(
+            database_url,
+            poolclass=NullPool,
+            isolation_level="READ COMMITTED",
+        )
+    # Sized for the parallel orchestrator: concurrent extractors each hold a
+    # connection while COPYing, plus the wallet/run-log queries
+    return create_engine(
+        database_url,
+        pool_size=20,
+        max_overflow=30,
+        pool_recycle=1800,
+        pool_pre_ping=True,
+        isolation_level="READ COMMITTED",
+    )
+
+
+def fetch_distinct_wallets(engine: Engine) -> list[str]:
+    """
+    Distinct sender addresses from raw.etherscan_transactions.
+
+    Streams through a server-side cursor in 50k-row batches straight into a
+    list; no DataFrame is built for what is a single column.
+    """
+    with engine.connect().execution_options(stream_results=True, yield_per=50_000) as conn:
+        result = conn.execute(text("SELECT DISTINCT from_address FROM raw.etherscan_transactions"))
+        return list(result.scalars())
+
 
 class PostgresLoader:
     """Loads DataFrames into PostgreSQL with upsert and full-refresh strategies."""
 
     def __init__(self, database_url: str | None = None) -> None:
         self.database_url = database_url or settings.database_url
-        self._engine: Engine | None = None
+        self._wallets: list[str] | None = None
 
     @property
     def engine(self) -> Engine:
-        if self._engine is None:
-            self._engine = create_engine(
-                self.database_url,
-                pool_size=5,
-                max_overflow=10,
-                pool_pre_ping=True,
-            )
-        return self._engine
+        # Resolved per access (a cached lookup) so a loader copied into a
+        # worker process picks up that process's own engine
+        return get_engine(self.database_url)
+
+    @contextmanager
+    def _transaction(self, conn: Connection | None) -> Iterator[Connection]:
+        """Use the caller's connection (they commit), else a fresh engine.begin()."""
+        if conn is not None:
+            yield conn
+        else:
+            with self.engine.begin() as new_conn:
+                yield new_conn
 
     def upsert(
         self,
@@ -43,15 +111,26 @@ class PostgresLoader:
         table: str,
         conflict_columns: list[str] | None = None,
         schema: str = "raw",
+        use_explicit_upsert: bool = False,
+        conn: Connection | None = None,
     ) -> int:
         """
         Insert rows, update on conflict.
+
+        Streams the DataFrame with COPY into a session temp table shaped like
+        the target (no per-row INSERT parsing), then merges it with a single
+        set-based INSERT ... SELECT ... ON CONFLICT.
         
         Args:
             df: DataFrame to load
             table: Target table name (without schema)
             conflict_columns: Columns that form the unique constraint
             schema: Target schema (default: raw)
+            use_explicit_upsert: Merge with UPDATE ... FROM + anti-join INSERT
+                instead of ON CONFLICT; both are hash joins, which beats
+                per-row conflict checks on large batches with composite keys
+            conn: Run inside this connection's transaction instead of
+                committing on its own
         
         Returns:
             Number of rows upserted
@@ -60,75 +139,248 @@ class PostgresLoader:
             logger.warning(f"Empty DataFrame, skipping upsert to {schema}.{table}")
             return 0
 
+        return self._copy_and_merge(
+            table,
+            list(df.columns),
+            len(df),
+            lambda c, temp_table: self._copy_from_dataframe(c, df, temp_table),
+            conflict_columns,
+            schema,
+            use_explicit_upsert,
+            conn,
+        )
+
+    def copy_columns(
+        self,
+        columns: dict[str, np.ndarray],
+        table: str,
+        conflict_columns: list[str] | None = None,
+        schema: str = "raw",
+        use_explicit_upsert: bool = False,
+        conn: Connection | None = None,
+    ) -> int:
+        """
+        Upsert column arrays (structure-of-arrays) without building a DataFrame.
+
+        Same temp-table COPY + merge as upsert(); the arrays are CSV-encoded
+        by Arrow's C++ writer straight into the COPY buffer.
+
+        Returns:
+            Number of rows upserted
+        """
+        rows = len(next(iter(columns.values()), ()))
+        if rows == 0:
+            logger.warning(f"No rows, skipping upsert to {schema}.{table}")
+            return 0
+
+        return self._copy_and_merge(
+            table,
+            list(columns),
+            rows,
+            lambda c, temp_table: self._copy_from_columns(c, columns, temp_table),
+            conflict_columns,
+            schema,
+            use_explicit_upsert,
+            conn,
+        )
+
+    def _copy_and_merge(
+        self,
+        table: str,
+        columns: list[str],
+        rows: int,
+        copy: Callable[[Connection, str], None],
+        conflict_columns: list[str] | None,
+        schema: str,
+        use_explicit_upsert: bool,
+        conn: Connection | None = None,
+    ) -> int:
+        """COPY rows into a temp table via `copy`, then merge it into schema.table."""
         full_table = f"{schema}.{table}"
-        temp_table = f"_temp_{table}_{int(datetime.utcnow().timestamp())}"
-
-        with self.engine.begin() as conn:
-            # Load to temp table
-            df.to_sql(
-                temp_table,
-                conn,
-                schema=schema,
-                if_exists="replace",
-                index=False,
-                method="multi",
-                chunksize=1000,
-            )
 
-            if conflict_columns:
-                conflict_str = ", ".join([f'"{c}"' for c in conflict_columns])
-                target_cols_str = ", ".join([f'"{c}"' for c in df.columns])
-                update_cols = [c for c in df.columns if c not in conflict_columns]
-                if update_cols:
-                    update_str = ", ".join([f'"{c}" = EXCLUDED."{c}"' for c in update_cols])
-                    upsert_sql = f"""
-                        INSERT INTO {full_table} ({target_cols_str})
-                        SELECT {target_cols_str} FROM {schema}.{temp_table}
-                        ON CONFLICT ({conflict_str})
-                        DO UPDATE SET {update_str}
-                    """
-                else:
-                    upsert_sql = f"""
-                        INSERT INTO {full_table} ({target_cols_str})
-                        SELECT {target_cols_str} FROM {schema}.{temp_table}
-                        ON CONFLICT ({conflict_str}) DO NOTHING
-                    """
-                logger.info(f"UPSERT SQL: {upsert_sql}")
-                conn.execute(text(upsert_sql))
+        # A caller-owned connection may run many loads in one transaction
+        shared = conn is not None
+        with self._transaction(conn) as conn:
+            temp_table = self._create_temp_table(conn, table, full_table)
+            copy(conn, temp_table)
 
-            # Drop temp
-            conn.execute(text(f"DROP TABLE IF EXISTS {schema}.{temp_table}"))
+            templates = self._merge_sql_templates(
+                full_table,
+                tuple(columns),
+                tuple(conflict_columns or ()),
+                use_explicit_upsert,
+            )
+            for template in templates:
+                upsert_sql = template.substitute(source=temp_table)
+                # Lazy: the (possibly multi-KB) statement is only formatted if DEBUG is on
+                logger.opt(lazy=True).debug("UPSERT SQL: {}", lambda: upsert_sql)
+                conn.execute(text(upsert_sql))
+            if shared:
+                # ON COMMIT DROP only fires when the caller commits; drop now
+                # so their chunked loads don't pile up temp tables until then
+                conn.execute(text(f"DROP TABLE {temp_table}"))
 
-        rows = len(df)
-        logger.debug(f"Upserted {rows:,} rows into {full_table}")
+        if table == "etherscan_transactions":
+            self._wallets = None
+        logger.debug("Upserted {:,} rows into {}", rows, full_table)
         return rows
 
+    @staticmethod
+    def _create_temp_table(conn: Connection, table: str, full_table: str) -> str:
+        """Create a staging copy of full_table that Postgres drops at COMMIT."""
+        temp_table = f"_temp_{table}_{os.getpid()}_{next(_TEMP_COUNTER)}"
+        conn.execute(
+            text(
+                f"CREATE TEMP TABLE {temp_table} (LIKE {full_table} INCLUDING DEFAULTS) "
+                "ON COMMIT DROP"
+            )
+        )
+        return temp_table
+
+    @staticmethod
+    def _copy_from_dataframe(conn: Connection, df: pd.DataFrame, table: str) -> None:
+        """
+        Stream a DataFrame into `table` with COPY ... FROM STDIN (CSV).
+
+        Serialised in COPY_CHUNK_ROWS slices so the CSV buffer never holds
+        more than one slice of a large extract at a time.
+        """
+        columns = ", ".join(f'"{c}"' for c in df.columns)
+        sql = f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT CSV, NULL '\\N')"
+        cursor = conn.connection.cursor()
+        try:
+            for start in range(0, len(df), COPY_CHUNK_ROWS):
+                buf = io.StringIO()
+                df.iloc[start:start + COPY_CHUNK_ROWS].to_csv(
+                    buf, index=False, header=False, na_rep="\\N"
+                )
+                buf.seek(0)
+                cursor.copy_expert(sql, buf)
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _copy_from_columns(conn: Connection, columns: dict[str, np.ndarray], table: str) -> None:
+        """Stream column arrays into `table` with COPY ... FROM STDIN (CSV via Arrow)."""
+        buf = io.BytesIO()
+        pa_csv.write_csv(
+            pa.table(columns), buf, pa_csv.WriteOptions(include_header=False)
+        )
+        buf.seek(0)
+        # Arrow writes nulls as bare empty fields and "" for empty strings,
+        # which is exactly COPY CSV's default NULL handling
+        names = ", ".join(f'"{c}"' for c in columns)
+        cursor = conn.connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {table} ({names}) FROM STDIN WITH (FORMAT CSV)", buf)
+        finally:
+            cursor.close()
+
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def _merge_sql_templates(
+        full_table: str,
+        columns: tuple[str, ...],
+        conflict_columns: tuple[str, ...],
+        use_explicit_upsert: bool,
+    ) -> tuple[Template, ...]:
+        """
+        Merge statements for a (table, columns, key) shape, with the temp table
+        left as a $source placeholder. Every batch for a table shares one shape,
+        so the SQL is rendered once per run instead of once per chunk.
+        """
+        if use_explicit_upsert and conflict_columns:
+            statements = PostgresLoader._build_explicit_upsert_sql(
+                full_table, "$source", list(columns), list(conflict_columns)
+            )
+        else:
+            statements = [
+                PostgresLoader._build_upsert_sql(
+                    full_table, "$source", list(columns), list(conflict_columns)
+                )
+            ]
+        return tuple(Template(sql) for sql in statements)
+
+    @staticmethod
+    def _build_upsert_sql(
+        full_table: str,
+        source_table: str,
+        columns: list[str],
+        conflict_columns: list[str],
+    ) -> str:
+        """INSERT ... SELECT from `source_table`, resolving conflicts on `conflict_columns`."""
+        cols_str = ", ".join(f'"{c}"' for c in columns)
+        insert_sql = f"INSERT INTO {full_table} ({cols_str}) SELECT {cols_str} FROM {source_table}"
+        if not conflict_columns:
+            return insert_sql
+
+        conflict_str = ", ".join(f'"{c}"' for c in conflict_columns)
+        update_cols = [c for c in columns if c not in conflict_columns]
+        if not update_cols:
+            return f"{insert_sql} ON CONFLICT ({conflict_str}) DO NOTHING"
+        update_str = ", ".join(f'"{c}" = EXCLUDED."{c}"' for c in update_cols)
+        return f"{insert_sql} ON CONFLICT ({conflict_str}) DO UPDATE SET {update_str}"
+
+    @staticmethod
+    def _build_explicit_upsert_sql(
+        full_table: str,
+        source_table: str,
+        columns: list[str],
+        conflict_columns: list[str],
+    ) -> list[str]:
+        """UPDATE matching rows from `source_table`, then INSERT the ones with no match."""
+        cols_str = ", ".join(f'"{c}"' for c in columns)
+        src_cols = ", ".join(f'src."{c}"' for c in columns)
+        join_on = " AND ".join(f'dst."{c}" = src."{c}"' for c in conflict_columns)
+        statements = []
+        update_cols = [c for c in columns if c not in conflict_columns]
+        if update_cols:
+            set_str = ", ".join(f'"{c}" = src."{c}"' for c in update_cols)
+            statements.append(
+                f"UPDATE {full_table} AS dst SET {set_str} FROM {source_table} AS src WHERE {join_on}"
+            )
+        statements.append(
+            f"INSERT INTO {full_table} ({cols_str}) SELECT {src_cols} FROM {source_table} AS src "
+            f'LEFT JOIN {full_table} AS dst ON {join_on} WHERE dst."{conflict_columns[0]}" IS NULL'
+        )
+        return statements
+
     def full_refresh(
         self,
         df: pd.DataFrame,
         table: str,
         schema: str = "raw",
+        conn: Connection | None = None,
     ) -> int:
-        """Truncate table and insert all rows."""
+        """
+        Replace the table's contents with df.
+
+        The frame is COPYed into a temp table first; TRUNCATE and the
+        INSERT ... SELECT then run in one transaction, so a failed load
+        leaves the old rows in place and readers never see an empty table.
+        """
         if df.empty:
             logger.warning(f"Empty DataFrame, skipping full refresh of {schema}.{table}")
             return 0
 
         full_table = f"{schema}.{table}"
-        with self.engine.begin() as conn:
-            conn.execute(text(f"TRUNCATE TABLE {full_table}"))
-            df.to_sql(
-                table,
-                conn,
-                schema=schema,
-                if_exists="append",
-                index=False,
-                method="multi",
-                chunksize=1000,
+        columns = ", ".join(f'"{c}"' for c in df.columns)
+        shared = conn is not None
+        with self._transaction(conn) as conn:
+            temp_table = self._create_temp_table(conn, table, full_table)
+            self._copy_from_dataframe(conn, df, temp_table)
+            conn.execute(text(f"TRUNCATE TABLE {full_table} RESTART IDENTITY"))
+            conn.execute(
+                text(f"INSERT INTO {full_table} ({columns}) SELECT {columns} FROM {temp_table}")
             )
+            if shared:
+                # Otherwise ON COMMIT DROP cleans up at the end of this transaction
+                conn.execute(text(f"DROP TABLE {temp_table}"))
 
+        if table == "etherscan_transactions":
+            self._wallets = None
         rows = len(df)
-        logger.debug(f"Full-refreshed {rows:,} rows into {full_table}")
+        logger.debug("Full-refreshed {:,} rows into {}", rows, full_table)
         return rows
 
     def get_last_loaded_timestamp(
@@ -149,6 +401,21 @@ class PostgresLoader:
             logger.warning(f"Could not get last timestamp from {schema}.{table}: {e}")
             return None
 
+    def get_distinct_wallets(self) -> list[str] | None:
+        """
+        Distinct sender addresses from raw.etherscan_transactions.
+
+        Cached on the loader (and reset whenever that table is written) so the
+        enrichment extractors share one DISTINCT scan per run.
+        """
+        if self._wallets is None:
+            try:
+                self._wallets = fetch_distinct_wallets(self.engine)
+            except Exception as e:
+                logger.warning(f"Could not fetch wallets from raw.etherscan_transactions: {e}")
+                return None
+        return self._wallets
+
     def log_run(
         self,
         extractor_name: str,
@@ -157,10 +424,50 @@ class PostgresLoader:
         rows_loaded: int = 0,
         started_at: datetime | None = None,
         error_message: str | None = None,
+        conn: Connection | None = None,
     ) -> None:
         """Log pipeline run metadata to raw._pipeline_runs."""
+        self.log_runs(
+            [
+                {
+                    "extractor_name": extractor_name,
+                    "status": status,
+                    "rows_extracted": rows_extracted,
+                    "rows_loaded": rows_loaded,
+                    "started_at": started_at,
+                    "error_message": error_message,
+                }
+            ],
+            conn=conn,
+        )
+
+    def log_runs(self, entries: list[dict], conn: Connection | None = None) -> None:
+        """
+        Log several runs to raw._pipeline_runs in one transaction.
+
+        Each entry has the log_run() fields as keys, plus an optional
+        completed_at (defaults to now). Written as one executemany, so
+        the whole pipeline costs a single commit. With `conn`, the insert
+        runs under a SAVEPOINT so a logging failure can't abort the
+        caller's transaction.
+        """
+        if not entries:
+            return
+        now = datetime.utcnow()
+        params = [
+            {
+                "name": e["extractor_name"],
+                "status": e["status"],
+                "extracted": e.get("rows_extracted", 0),
+                "loaded": e.get("rows_loaded", 0),
+                "started": e.get("started_at") or now,
+                "completed": e.get("completed_at") or now,
+                "error": e.get("error_message"),
+            }
+            for e in entries
+        ]
         try:
-            with self.engine.begin() as conn:
+            with self._transaction(conn) as conn, conn.begin_nested():
                 conn.execute(
                     text("""
                         INSERT INTO raw._pipeline_runs
@@ -168,16 +475,9 @@ class PostgresLoader:
                              started_at, completed_at, error_message)
                         VALUES
                             (:name, :status, :extracted, :loaded,
-                             :started, NOW(), :error)
+                             :started, :completed, :error)
                     """),
-                    {
-                        "name": extractor_name,
-                        "status": status,
-                        "extracted": rows_extracted,
-                        "loaded": rows_loaded,
-                        "started": started_at or datetime.utcnow(),
-                        "error": error_message,
-                    },
+                    params,
                 )
         except Exception as e:
             logger.warning(f"Could not log pipeline run: {e}")
@@ -5,13 +5,14 @@ Uses Zapper/Zerion logic to classify top traders vs retail based on win rate.
 """
 from __future__ import annotations
 
-import random
-
+import numpy as np
 import pandas as pd
 from loguru import logger
 
-from .base_extractor import BaseExtractor
+from ._rng import rng_for
+from .base_extractor import BaseExtractor, fallback_wallets
 from .config import settings
+from .loader import PostgresLoader, fetch_distinct_wallets, get_engine
 
 class PortfolioExtractor(BaseExtractor):
     """Enriches wallets with historical profitability (Win Rate) for Smart Money modeling."""
@@ -21,48 +22,58 @@ class PortfolioExtractor(BaseExtractor):
     target_table = "wallet_enrichment"
     rate_limit_rps = 1.0
 
-    def __init__(self, api_key: str | None = None) -> None:
+    def __init__(
+        self,
+        api_key: str | None = None,
+        wallets: list[str] | None = None,
+        loader: PostgresLoader | None = None,
+    ) -> None:
         super().__init__()
+        # Reuse the pipeline loader's connection pool when one is provided
+        self.loader = loader
+        # Pre-fetched wallet list (e.g. shared by the orchestrator); skips the DB query
+        self.wallets = wallets
         self.api_key = api_key or getattr(settings, "zapper_api_key", None)
 
     def extract(self) -> pd.DataFrame:
+        """DataFrame view of extract_columns() for callers outside the orchestrator."""
+        return pd.DataFrame(self.extract_columns(), copy=False)
+
+    def extract_columns(self) -> dict[str, np.ndarray]:
         """
         Calculates Win Rate (Profitable Swaps / Total Swaps)
         Falls back to statistical distribution if no bulk API access.
         """
         logger.info("[portfolio] Fetching wallets for profitability enrichment...")
-        try:
-            from sqlalchemy import create_engine
-            engine = create_engine(settings.database_url)
-            df_wallets = pd.read_sql("SELECT DISTINCT from_address as wallet_address FROM raw.etherscan_transactions", engine)
-            wallets = df_wallets["wallet_address"].tolist()
-        except Exception as e:
-            logger.warning(f"[portfolio] Could not fetch real wallets, using fallback ({e})")
-            wallets = [f"0x{hex(i)[2:].zfill(40)}" for i in range(1, 101)]
-
-        rows = []
-        for wallet in wallets:
-            # Smart money distribution:
-            # 5% have >60% win rate (Smart Money)
-            # 25% have 40-60% win rate (Average)
-            # 70% have <40% win rate (Retail / Dumb Money)
-            rand = random.random()
-            if rand < 0.05:
-                win_rate = random.uniform(0.60, 0.85)
-                realized_profit = random.uniform(10000, 500000)
-            elif rand < 0.30:
-                win_rate = random.uniform(0.40, 0.59)
-                realized_profit = random.uniform(-5000, 10000)
-            else:
-                win_rate = random.uniform(0.10, 0.39)
-                realized_profit = random.uniform(-50000, -100)
+        if self.wallets is not None:
+            wallets = list(self.wallets)
+        else:
+            try:
+                engine = self.loader.engine if self.loader else get_engine(settings.database_url)
+                wallets = fetch_distinct_wallets(engine)
+            except Exception as e:
+                logger.warning(f"[portfolio] Could not fetch real wallets, using fallback ({e})")
+                wallets = list(fallback_wallets())
 
-            rows.append({
-                "wallet_address": wallet,
-                "historical_win_rate": win_rate,
-                "realized_profit_usd": realized_profit,
-            })
+        # Smart money distribution, one bucket per wallet:
+        # 5% have >60% win rate (Smart Money)
+        # 25% have 40-60% win rate (Average)
+        # 70% have <40% win rate (Retail / Dumb Money)
+        rng = rng_for("portfolio")
+        n = len(wallets)
+        bucket = np.searchsorted([0.05, 0.30], rng.random(n), side="right")
+        win_rate = rng.uniform(
+            np.array([0.60, 0.40, 0.10])[bucket], np.array([0.85, 0.59, 0.39])[bucket]
+        )
+        realized_profit = rng.uniform(
+            np.array([10000.0, -5000.0, -50000.0])[bucket],
+            np.array([500000.0, 10000.0, -100.0])[bucket],
+        )
 
-        df = pd.DataFrame(rows)
-        logger.success(f"[portfolio] Generated Smart Money stats for {len(df):,} wallets")
-        return df
+        columns = {
+            "wallet_address": np.asarray(wallets, dtype=object),
+            "historical_win_rate": win_rate,
+            "realized_profit_usd": realized_profit,
+        }
+        logger.success(f"[portfolio] Generated Smart Money stats for {n:,} wallets")
+        return columns
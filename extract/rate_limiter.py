@@ -0,0 +1,40 @@
+"""
+TokenBucket — thread-safe client-side rate limiter shared by extractor workers.
+
+Tokens refill continuously at `rate` per second up to `capacity`. Callers
+reserve a token under a lock and sleep outside of it, so concurrent workers
+queue fairly and steady-state throughput converges to `rate` instead of
+drifting below it.
+"""
+from __future__ import annotations
+
+import threading
+import time
+
+
+class TokenBucket:
+    """Blocking token-bucket limiter (leaky-bucket semantics when exhausted)."""
+
+    def __init__(self, rate: float, capacity: float = 1.0) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, blocking until it is available. Returns seconds waited."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated_at) * self.rate
+            )
+            self._updated_at = now
+            # Going negative reserves a future token for this caller
+            self._tokens -= 1.0
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
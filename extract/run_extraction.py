@@ -11,6 +11,7 @@ Usage:
 from __future__ import annotations
 
 import sys
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from typing import Optional
 
@@ -18,7 +19,9 @@ import typer
 from loguru import logger
 from rich.console import Console
 from rich.table import Table
+from tenacity import Retrying, retry_if_exception, stop_after_attempt, wait_exponential
 
+from .base_extractor import is_transient_error
 from .config import settings
 from .coingecko_extractor import CoinGeckoExtractor
 from .defillama_extractor import DeFiLlamaExtractor
@@ -29,6 +32,17 @@ from .portfolio_extractor import PortfolioExtractor
 from .loader import PostgresLoader
 
 app = typer.Typer(help="DeFi Revenue Attribution — Extract Pipeline")
+
+# Extractors that enrich the wallets Etherscan loaded; they share one DISTINCT scan.
+# Dune joins them only when it seeds mock labels (see _needs_wallets)
+WALLET_CONSUMERS = {"lifi", "portfolio"}
+# Sources merged with UPDATE + INSERT instead of ON CONFLICT (see PostgresLoader.upsert)
+EXPLICIT_UPSERT_SOURCES = {"defillama"}
+# Extractors are I/O bound and independent apart from the wallet dependency
+MAX_PARALLEL_EXTRACTORS = 4
+# Attempts per chunk load on a transient DB error. HTTP calls are retried
+# only inside BaseExtractor._make_request, so retries never stack.
+LOAD_ATTEMPTS = 3
 console = Console()
 
 
@@ -48,17 +62,28 @@ def _configure_logging() -> None:
     )
 
 
-def _run_extractor(extractor, loader: PostgresLoader, source_name: str) -> dict:
-    """Run a single extractor and return result metadata."""
+def _run_extractor(extractor, loader: PostgresLoader | None, source_name: str) -> dict:
+    """
+    Run a single extractor and return result metadata.
+
+    With loader=None (--dry-run) the extract runs and rows are counted, but
+    nothing is written. The `_pipeline_runs` entry is returned under "run" rather than written
+    here; run() flushes every entry with one loader.log_runs() call.
+    """
     started = datetime.utcnow()
-    try:
-        df = extractor.extract()
-        df = extractor.validate(df)
 
-        if df.empty:
-            loader.log_run(source_name, "partial", 0, 0, started)
-            return {"source": source_name, "status": "⚠️ empty", "rows": 0}
+    def _run_entry(status: str, extracted: int = 0, loaded: int = 0, error: str | None = None) -> dict:
+        return {
+            "extractor_name": source_name,
+            "status": status,
+            "rows_extracted": extracted,
+            "rows_loaded": loaded,
+            "started_at": started,
+            "completed_at": datetime.utcnow(),
+            "error_message": error,
+        }
 
+    try:
         # Each extractor has its own conflict column logic
         conflict_map = {
             "etherscan": ["tx_hash"],
@@ -69,15 +94,110 @@ def _run_extractor(extractor, loader: PostgresLoader, source_name: str) -> dict:
             "portfolio": ["wallet_address"],
         }
         conflict_cols = conflict_map.get(source_name)
+        # Wide rows on a composite key: UPDATE + anti-join INSERT beats ON CONFLICT
+        explicit_upsert = source_name in EXPLICIT_UPSERT_SOURCES
+
+        # Transient load failures (OperationalError: dropped connection,
+        # lock/statement timeout) retry just that chunk with backoff; the
+        # extract itself is not re-run
+        retrying = Retrying(
+            retry=retry_if_exception(is_transient_error),
+            wait=wait_exponential(min=1, max=30),
+            stop=stop_after_attempt(LOAD_ATTEMPTS),
+            before_sleep=lambda state: logger.warning(
+                f"[{source_name}] Transient load failure ({state.outcome.exception()}), "
+                f"retrying (attempt {state.attempt_number + 1}/{LOAD_ATTEMPTS})..."
+            ),
+            reraise=True,
+        )
+
+        # Each load commits on its own (the loader opens a short transaction),
+        # so no connection idles in a transaction while the next page is
+        # fetched and committed chunks survive a later failure. Without a
+        # loader (--dry-run) rows are only extracted and counted.
+        rows_extracted = rows = 0
+        columns = extractor.extract_columns()
+        if columns is not None:
+            # Array-native sources COPY straight from NumPy, no DataFrame in between
+            rows_extracted = len(next(iter(columns.values()), ()))
+            logger.info(f"[{source_name}] Extracted {rows_extracted:,} rows")
+            if rows_extracted and loader is not None:
+                rows = retrying(
+                    loader.copy_columns,
+                    columns,
+                    extractor.target_table,
+                    conflict_columns=conflict_cols,
+                    use_explicit_upsert=explicit_upsert,
+                )
+        else:
+            # Load chunk by chunk so streaming extractors never materialise everything
+            for df in extractor.extract_chunks():
+                df = extractor.validate(df)
+                if df.empty:
+                    continue
+                rows_extracted += len(df)
+                if loader is not None:
+                    rows += retrying(
+                        loader.upsert,
+                        df,
+                        extractor.target_table,
+                        conflict_columns=conflict_cols,
+                        use_explicit_upsert=explicit_upsert,
+                    )
+
+        if rows_extracted == 0:
+            return {
+                "source": source_name, "status": "⚠️ empty", "rows": 0,
+                "run": _run_entry("partial"),
+            }
+
+        if loader is None:
+            return {
+                "source": source_name,
+                "status": f"✅ dry run ({rows_extracted:,} extracted)",
+                "rows": 0,
+                "run": _run_entry("success", rows_extracted),
+            }
 
-        rows = loader.upsert(df, extractor.target_table, conflict_columns=conflict_cols)
-        loader.log_run(source_name, "success", len(df), rows, started)
-        return {"source": source_name, "status": "✅ success", "rows": rows}
+        return {
+            "source": source_name, "status": "✅ success", "rows": rows,
+            "run": _run_entry("success", rows_extracted, rows),
+        }
 
     except Exception as e:
-        loader.log_run(source_name, "failed", 0, 0, started, str(e))
-        logger.error(f"Extractor {source_name} failed: {e}")
-        return {"source": source_name, "status": "❌ failed", "rows": 0, "error": str(e)}
+        kind = "transient error, retries exhausted" if is_transient_error(e) else "error"
+        logger.error(f"Extractor {source_name} failed ({kind}): {e}")
+        return {
+            "source": source_name, "status": "❌ failed", "rows": 0, "error": str(e),
+            "run": _run_entry("failed", error=str(e)),
+        }
+    finally:
+        extractor.close()
+
+
+def _needs_wallets(name: str, extractor) -> bool:
+    """True if the extractor labels the wallets Etherscan loads, so must run after it."""
+    if name == "dune":
+        # With an API key the labels come from Dune itself, not our wallets
+        return not extractor.api_key
+    return name in WALLET_CONSUMERS
+
+
+def _skipped_result(source_name: str, reason: str) -> dict:
+    """Result metadata for an extractor that was never started."""
+    now = datetime.utcnow()
+    return {
+        "source": source_name, "status": "⏭️ skipped", "rows": 0,
+        "run": {
+            "extractor_name": source_name,
+            "status": "partial",
+            "rows_extracted": 0,
+            "rows_loaded": 0,
+            "started_at": now,
+            "completed_at": now,
+            "error_message": reason,
+        },
+    }
 
 
 @app.command()
@@ -100,10 +220,10 @@ def run(
     extractors_to_run = {
         "etherscan":  EtherscanExtractor(),
         "defillama":  DeFiLlamaExtractor(),
-        "dune":       DuneExtractor(),
+        "dune":       DuneExtractor(loader=loader),
         "coingecko":  CoinGeckoExtractor(),
-        "lifi":       LiFiExtractor(),
-        "portfolio":  PortfolioExtractor(),
+        "lifi":       LiFiExtractor(loader=loader),
+        "portfolio":  PortfolioExtractor(loader=loader),
     }
 
     # Filter by source if specified
@@ -114,11 +234,48 @@ def run(
             raise typer.Exit(1)
         extractors_to_run = {source: extractors_to_run[source]}
 
-    results = []
-    for name, extractor in extractors_to_run.items():
-        console.print(f"[bold]▶ Running {name} extractor...[/bold]")
-        result = _run_extractor(extractor, loader if not dry_run else None, name)
-        results.append(result)
+    target_loader = loader if not dry_run else None
+    futures: dict[str, Future] = {}
+    with ThreadPoolExecutor(
+        max_workers=MAX_PARALLEL_EXTRACTORS, thread_name_prefix="extractor"
+    ) as pool:
+        # Stage 1: independent sources run side by side
+        consumers = {n: e for n, e in extractors_to_run.items() if _needs_wallets(n, e)}
+        for name, extractor in extractors_to_run.items():
+            if name not in consumers:
+                console.print(f"[bold]▶ Running {name} extractor...[/bold]")
+                futures[name] = pool.submit(_run_extractor, extractor, target_loader, name)
+
+        # Stage 2: enrichment needs the wallets Etherscan has just loaded
+        skipped: dict[str, dict] = {}
+        if consumers and "etherscan" in futures:
+            etherscan_status = futures["etherscan"].result()["status"]
+            if "failed" in etherscan_status:
+                # The DB still holds the previous run's wallets; don't enrich those
+                logger.warning(
+                    f"Etherscan failed, skipping wallet enrichment: {', '.join(consumers)}"
+                )
+                skipped = {
+                    name: _skipped_result(name, "skipped: etherscan extract failed")
+                    for name in consumers
+                }
+                for extractor in consumers.values():
+                    extractor.close()
+                consumers = {}
+        # One DISTINCT scan shared by every consumer
+        wallets = loader.get_distinct_wallets() if consumers and not dry_run else None
+        for name, extractor in consumers.items():
+            console.print(f"[bold]▶ Running {name} extractor...[/bold]")
+            if wallets is not None:
+                extractor.wallets = wallets
+            futures[name] = pool.submit(_run_extractor, extractor, target_loader, name)
+
+    results = [
+        skipped[name] if name in skipped else futures[name].result()
+        for name in extractors_to_run
+    ]
+    if not dry_run:
+        loader.log_runs([r["run"] for r in results])
 
     # Print summary table
     table = Table(title="\n📊 Extraction Summary", show_header=True)
@@ -79,3 +79,19 @@ class TestDeFiLlamaExtractor:
         df = extractor.extract_tvl()
         dupes = df.duplicated(subset=["protocol_slug", "chain", "date"])
         assert not dupes.any()
+
+    @patch.object(DeFiLlamaExtractor, "_make_request")
+    def test_extract_fees_uses_single_overview_call(self, mock_request, extractor):
+        """Both protocols should be served by one /overview/fees/ethereum request."""
+        mock_request.return_value = {
+            "totalDataChartBreakdown": [
+                [1704067200, {"Uniswap V3": 1_234.567, "Aave V3": 890.1, "Curve": 5.0}],
+                [1704153600, {"Uniswap V3": 1_500.0, "Aave V3": 900.0}],
+            ]
+        }
+        df = extractor.extract_fees()
+
+        assert mock_request.call_count == 1
+        assert mock_request.call_args.args[0] == "/overview/fees/ethereum"
+        assert sorted(df["protocol_slug"].unique()) == ["aave-v3", "uniswap-v3"]
+        assert len(df) == 4
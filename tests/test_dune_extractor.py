@@ -53,6 +53,18 @@ def test_poll_execution_failed_state(extractor, mocker):
 
     assert rows == []
 
+def test_poll_execution_backs_off_exponentially(extractor, mocker):
+    pending = mocker.Mock()
+    pending.json.return_value = {"state": "QUERY_STATE_EXECUTING"}
+    done = mocker.Mock()
+    done.json.return_value = {"state": "QUERY_STATE_COMPLETED", "result": {"rows": []}}
+    mocker.patch('requests.get', side_effect=[pending, pending, pending, done])
+    sleep = mocker.patch('extract.dune_extractor.time.sleep')
+
+    extractor._poll_execution("test_exec_123")
+
+    assert [c.args[0] for c in sleep.call_args_list] == [0.5, 1.0, 2.0]
+
 def test_get_mock_labels(extractor):
     df = extractor._get_mock_labels()
     
@@ -86,3 +98,12 @@ def test_extract_without_api_key(mocker):
     assert len(df) == 1
     assert df.iloc[0]["wallet_address"] == "0xmock"
     no_key_extractor._get_mock_labels.assert_called_once()
+
+def test_get_mock_labels_uses_prefetched_wallets(mocker):
+    engine = mocker.patch('extract.dune_extractor.get_engine')
+    extractor = DuneExtractor(api_key="", wallets=["0xabc", "0xdef"])
+
+    df = extractor._get_mock_labels()
+
+    assert df["wallet_address"].tolist() == ["0xabc", "0xdef"]
+    engine.assert_not_called()
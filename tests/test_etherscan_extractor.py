@@ -1,12 +1,15 @@
 """
 Unit tests for EtherscanExtractor.
 """
+import json
+
 import pytest
 from unittest.mock import MagicMock, patch
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
-from extract.etherscan_extractor import EtherscanExtractor
+from extract.etherscan_extractor import WEI_DTYPE, EtherscanExtractor
 
 
 @pytest.fixture
@@ -54,6 +57,26 @@ def mock_api_response():
     }
 
 
+def _make_raw(n: int, seed: int = 0) -> list[dict]:
+    """Synthesize n txlist records column-wise with NumPy, zipped into dicts at the end."""
+    rng = np.random.default_rng(seed)
+    hashes = ["0x" + h for h in rng.bytes(32 * n).hex(" ", 32).split()] if n else []
+    senders = [f"0xUSER{i:036X}" for i in rng.integers(0, max(1, n // 10), n)]
+    blocks = (19_000_000 + np.arange(n) // 5).astype(str)
+    stamps = (1_700_000_000 + np.arange(n) * 12 // 5).astype(str)
+    values = rng.integers(0, 10**18, n).astype(str)
+    method_ids = rng.choice(["0x414bf389", "0x617ba037", "0xdeadbeef"], n)
+    names = rng.choice(["", "exactInputSingle(tuple params)", "supply(address,uint256)"], n)
+    return [
+        {
+            "hash": h, "blockNumber": b, "timeStamp": t, "from": f, "to": "0xContract1",
+            "contractAddress": "", "value": v, "gasUsed": "150000", "gasPrice": "20000000000",
+            "methodId": m, "functionName": fn, "isError": "0",
+        }
+        for h, b, t, f, v, m, fn in zip(hashes, blocks, stamps, senders, values, method_ids, names)
+    ]
+
+
 class TestEtherscanExtractor:
     def test_initialization(self, extractor):
         assert extractor.name == "etherscan"
@@ -77,6 +100,37 @@ class TestEtherscanExtractor:
         # value_wei should be 1e18 for first tx
         assert df.iloc[0]["value_wei"] == 1_000_000_000_000_000_000
 
+    def test_wei_columns_are_fixed_width(self, extractor, mock_api_response):
+        """Wei stays an exact Arrow decimal, never object dtype, even above uint64."""
+        raw = [dict(tx) for tx in mock_api_response["result"]]
+        raw[1]["value"] = str(10**24)  # 1M ETH: overflows uint64
+        df = extractor._parse_transactions(raw, "Uniswap V3")
+        assert df["value_wei"].dtype == WEI_DTYPE
+        assert df["gas_price_wei"].dtype == WEI_DTYPE
+        assert df["block_number"].dtype == "int64"
+        assert df["gas_used"].dtype == "int64"
+        assert df.iloc[1]["value_wei"] == 10**24
+
+    def test_parse_empty_page_keeps_schema(self, extractor, mock_api_response):
+        """An empty page short-circuits to a frame with the parsed columns and dtypes."""
+        parsed = extractor._parse_transactions(mock_api_response["result"], "Uniswap V3")
+        empty = extractor._parse_transactions([], "Uniswap V3")
+        assert empty.empty
+        assert empty.dtypes.astype(str).to_dict() == parsed.dtypes.astype(str).to_dict()
+
+    @pytest.mark.parametrize("n", [10_000])
+    def test_parse_transactions_large(self, extractor, n):
+        raw = _make_raw(n)
+        df = extractor._parse_transactions(raw, "Uniswap V3")
+
+        assert len(df) == n
+        assert df["tx_hash"].is_unique
+        assert df["value_wei"].dtype == WEI_DTYPE
+        assert isinstance(df["function_name"].dtype, pd.CategoricalDtype)
+        assert set(df["function_name"].cat.categories) <= {"exactInputSingle", "supply", "unknown"}
+        assert (df["from_address"] == df["from_address"].str.lower()).all()
+        assert df["value_wei"].iloc[-1] == int(raw[-1]["value"])
+
     def test_method_id_classification(self, extractor, mock_api_response):
         raw = mock_api_response["result"]
         df = extractor._parse_transactions(raw, "Uniswap V3")
@@ -88,7 +142,8 @@ class TestEtherscanExtractor:
         df = extractor._parse_transactions(raw, "Uniswap V3")
         assert df.iloc[0]["from_address"] == "0xuser1"
 
-    def test_deduplication_by_tx_hash(self, extractor):
+    @patch.object(EtherscanExtractor, "_make_request")
+    def test_deduplication_by_tx_hash(self, mock_request, extractor):
         """Duplicate transactions should be removed."""
         raw = [
             {
@@ -106,9 +161,34 @@ class TestEtherscanExtractor:
                 "isError": "0",
             }
         ] * 3  # Same tx 3 times
+        mock_request.return_value = {"status": "1", "message": "OK", "result": raw}
 
-        df = extractor._parse_transactions(raw, "Uniswap V3")
-        assert len(df) == 1
+        chunks = list(extractor.iter_transactions("0xtest", "Uniswap V3"))
+        assert sum(len(c) for c in chunks) == 1
+
+    def test_extract_dedupes_full_length_hashes(self, extractor, mock_api_response):
+        """Prefix-keyed dedupe drops repeats but keeps hashes that only share a prefix."""
+        first, second = (dict(tx) for tx in mock_api_response["result"])
+        first["hash"] = "0x" + "ab" * 32
+        second["hash"] = "0x" + "ab" * 8 + "cd" * 24  # same first 16 hex chars
+        page = extractor._parse_transactions([first, second], "Uniswap V3")
+        with patch.object(extractor, "extract_chunks", return_value=iter([page, page])):
+            df = extractor.extract()
+        assert df["tx_hash"].tolist() == [first["hash"], second["hash"]]
+        assert df.index.tolist() == [0, 1]
+
+    def test_extract_keeps_categoricals_across_protocols(self, extractor, mock_api_response):
+        """Pages from different protocols concatenate without decoding categories."""
+        first, second = mock_api_response["result"]
+        pages = [
+            extractor._parse_transactions([first], "Uniswap V3"),
+            extractor._parse_transactions([second], "Aave V3"),
+        ]
+        with patch.object(extractor, "extract_chunks", return_value=iter(pages)):
+            df = extractor.extract()
+        assert isinstance(df["protocol_name"].dtype, pd.CategoricalDtype)
+        assert isinstance(df["function_name"].dtype, pd.CategoricalDtype)
+        assert df["protocol_name"].tolist() == ["Uniswap V3", "Aave V3"]
 
     @patch.object(EtherscanExtractor, "_make_request")
     def test_extract_transactions_stops_on_empty(self, mock_request, extractor):
@@ -120,6 +200,80 @@ class TestEtherscanExtractor:
         )
         assert df.empty or len(df) == 0
 
+    @patch.object(EtherscanExtractor, "_make_request")
+    def test_iter_transactions_yields_one_frame_per_page(self, mock_request, extractor, mock_api_response):
+        """Each full page is parsed and yielded before the next one is fetched."""
+        last_page = {"status": "1", "message": "OK", "result": mock_api_response["result"][:1]}
+        mock_request.side_effect = [mock_api_response, last_page]
+        chunks = list(extractor.iter_transactions("0xtest", "Test Protocol", page_size=2))
+
+        assert [len(c) for c in chunks] == [2, 1]
+        # Resumes at the last block seen (not +1) so a split block isn't lost
+        second = mock_request.call_args_list[1].kwargs["params"]
+        assert second["startblock"] == 19000001
+        assert second["page"] == 1
+
+    @patch.object(EtherscanExtractor, "_make_request")
+    def test_iter_transactions_drops_page_boundary_overlap(self, mock_request, extractor, mock_api_response):
+        """Txs from the boundary block re-fetched on the next page aren't yielded twice."""
+        first, second = mock_api_response["result"]
+        extra = {**second, "hash": "0xfff789"}
+        mock_request.side_effect = [
+            {"status": "1", "message": "OK", "result": [first, second]},
+            {"status": "1", "message": "OK", "result": [second, extra]},
+            {"status": "1", "message": "OK", "result": [extra]},
+        ]
+        chunks = list(extractor.iter_transactions("0xtest", "Test Protocol", page_size=2))
+
+        hashes = pd.concat(chunks)["tx_hash"].tolist()
+        assert hashes == ["0xabc123", "0xdef456", "0xfff789"]
+
+    def test_rate_limit_reply_is_retried_not_treated_as_end(self, extractor, mock_api_response):
+        """An in-band NOTOK rate-limit reply backs off and refetches the same page."""
+        throttled = MagicMock(status_code=200, content=b'{"status": "0", "message": "NOTOK", '
+                              b'"result": "Max calls per sec rate limit reached (5/sec)"}')
+        ok = MagicMock(status_code=200, content=json.dumps(mock_api_response).encode())
+        with patch.object(extractor._session, "get", side_effect=[throttled, ok]) as get, \
+                patch("time.sleep"):
+            chunks = list(extractor.iter_transactions("0xtest", "Test Protocol"))
+
+        assert get.call_count == 2
+        assert sum(len(c) for c in chunks) == 2
+
+    def test_api_error_reply_raises(self, extractor):
+        """Non-throttling NOTOK replies fail the walk instead of ending it quietly."""
+        invalid = MagicMock(status_code=200, content=b'{"status": "0", "message": "NOTOK", '
+                            b'"result": "Invalid API Key"}')
+        with patch.object(extractor._session, "get", return_value=invalid) as get:
+            with pytest.raises(RuntimeError, match="Invalid API Key"):
+                list(extractor.iter_transactions("0xtest", "Test Protocol"))
+        assert get.call_count == 1
+
+    def test_parquet_roundtrip_preserves_dtypes(self, extractor, mock_api_response, tmp_path):
+        df = extractor._parse_transactions(mock_api_response["result"], "Uniswap V3")
+        path = tmp_path / "transactions.parquet"
+        extractor.save(df, path)
+        restored = extractor.load(path)
+        assert restored.dtypes.astype(str).to_dict() == df.dtypes.astype(str).to_dict()
+        pd.testing.assert_frame_equal(restored, df)
+
+    @pytest.mark.parametrize("compression", ["zstd", "uncompressed"])
+    def test_roundtrip_feather_preserves_dtypes(self, extractor, mock_api_response, tmp_path, compression):
+        df = extractor._parse_transactions(mock_api_response["result"], "Uniswap V3")
+        path = tmp_path / "transactions.feather"
+        extractor.save_feather(df, path, compression=compression)
+        restored = extractor.load_feather(path)
+        assert str(restored["block_timestamp"].dtype) == "datetime64[s, UTC]"
+        assert restored["value_wei"].dtype == WEI_DTYPE
+        pd.testing.assert_frame_equal(restored, df)
+
+    def test_split_block_range_is_disjoint_and_complete(self, extractor):
+        ranges = extractor._split_block_range(0, 99, 8)
+        assert len(ranges) == 8
+        assert ranges[0][0] == 0 and ranges[-1][1] == 99
+        for (_, hi), (lo, _) in zip(ranges, ranges[1:]):
+            assert lo == hi + 1
+
     def test_validate_returns_dataframe(self, extractor):
         """validate() should return the same DataFrame unchanged."""
         df = pd.DataFrame({"col": [1, 2, 3]})
@@ -0,0 +1,124 @@
+import dataclasses
+
+import pandas as pd
+import pytest
+from sqlalchemy.exc import DBAPIError
+
+from extract.defillama_extractor import DeFiLlamaExtractor
+from extract.lifi_extractor import LiFiExtractor
+from extract.run_extraction import _run_extractor
+
+
+@pytest.fixture
+def tvl_frame():
+    return pd.DataFrame(
+        {
+            "protocol_slug": ["uniswap-v3", "aave-v3"],
+            "protocol_name": ["Uniswap V3", "Aave V3"],
+            "chain": ["ethereum", "ethereum"],
+            "date": pd.to_datetime(["2024-01-01", "2024-01-01"]),
+            "tvl_usd": [1.0, 2.0],
+        }
+    )
+
+def test_dry_run_streaming_extractor_counts_rows_without_loader(mocker, tvl_frame):
+    extractor = DeFiLlamaExtractor()
+    mocker.patch.object(extractor, "extract_chunks", return_value=iter([tvl_frame, tvl_frame]))
+
+    result = _run_extractor(extractor, None, "defillama")
+
+    assert "failed" not in result["status"]
+    assert result["rows"] == 0
+    assert result["run"]["status"] == "success"
+    assert result["run"]["rows_extracted"] == 4
+
+def test_dry_run_column_extractor_counts_rows_without_loader():
+    extractor = LiFiExtractor(wallets=["0xa", "0xb", "0xc"])
+
+    result = _run_extractor(extractor, None, "lifi")
+
+    assert "failed" not in result["status"]
+    assert result["run"]["rows_extracted"] == 3
+    assert result["run"]["rows_loaded"] == 0
+
+def test_transient_load_error_retries_only_that_chunk(mocker, tvl_frame):
+    extractor = DeFiLlamaExtractor()
+    chunks = mocker.patch.object(extractor, "extract_chunks", return_value=iter([tvl_frame]))
+    loader = mocker.Mock()
+    loader.upsert.side_effect = [TimeoutError("statement timeout"), len(tvl_frame)]
+    mocker.patch("time.sleep")
+
+    result = _run_extractor(extractor, loader, "defillama")
+
+    assert result["status"] == "✅ success"
+    assert loader.upsert.call_count == 2
+    chunks.assert_called_once()
+
+def test_dropped_db_connection_retries_the_chunk(mocker, tvl_frame):
+    extractor = DeFiLlamaExtractor()
+    mocker.patch.object(extractor, "extract_chunks", return_value=iter([tvl_frame]))
+    loader = mocker.Mock()
+    dropped = DBAPIError("COPY ...", None, Exception("server closed the connection"),
+                         connection_invalidated=True)
+    loader.upsert.side_effect = [dropped, len(tvl_frame)]
+    mocker.patch("time.sleep")
+
+    result = _run_extractor(extractor, loader, "defillama")
+
+    assert result["status"] == "✅ success"
+    assert loader.upsert.call_count == 2
+
+def test_data_error_is_not_retried(mocker, tvl_frame):
+    extractor = DeFiLlamaExtractor()
+    mocker.patch.object(extractor, "extract_chunks", return_value=iter([tvl_frame]))
+    loader = mocker.Mock()
+    loader.upsert.side_effect = KeyError("tvl_usd")
+
+    result = _run_extractor(extractor, loader, "defillama")
+
+    assert "failed" in result["status"]
+    assert loader.upsert.call_count == 1
+
+def _invoke_pipeline(mocker, status: str, dune_api_key: str = ""):
+    """Run the CLI with every extractor stubbed to return `status`."""
+    from typer.testing import CliRunner
+
+    from extract import dune_extractor, run_extraction
+
+    mocker.patch.object(
+        dune_extractor, "settings",
+        dataclasses.replace(dune_extractor.settings, dune_api_key=dune_api_key),
+    )
+    loader = mocker.Mock()
+    mocker.patch.object(run_extraction, "PostgresLoader", return_value=loader)
+    mocker.patch.object(run_extraction, "_configure_logging")
+    runs = mocker.patch.object(
+        run_extraction,
+        "_run_extractor",
+        side_effect=lambda extractor, loader, name: {
+            "source": name, "status": status, "rows": 0, "run": {"extractor_name": name},
+        },
+    )
+    CliRunner().invoke(run_extraction.app, [])
+    return loader, [call.args[2] for call in runs.call_args_list]
+
+def test_wallet_consumers_share_one_wallet_fetch(mocker):
+    loader, started = _invoke_pipeline(mocker, "✅ success")
+
+    assert {"dune", "lifi", "portfolio"} <= set(started)
+    loader.get_distinct_wallets.assert_called_once()
+
+def test_wallet_consumers_skipped_when_etherscan_fails(mocker):
+    loader, started = _invoke_pipeline(mocker, "❌ failed")
+
+    assert "etherscan" in started
+    assert not {"dune", "lifi", "portfolio"} & set(started)
+    loader.get_distinct_wallets.assert_not_called()
+    logged = {entry["extractor_name"]: entry for entry in loader.log_runs.call_args.args[0]}
+    assert logged["lifi"]["error_message"] == "skipped: etherscan extract failed"
+
+def test_dune_with_api_key_runs_even_when_etherscan_fails(mocker):
+    _, started = _invoke_pipeline(mocker, "❌ failed", dune_api_key="key")
+
+    assert "dune" in started
+    assert not {"lifi", "portfolio"} & set(started)